@@ -1,24 +1,70 @@
 from django.contrib import admin
-from .models import NewsItem, Filter, Alert, AlertHistory
+from .matching import invalidate_filter_automaton
+from .models import NewsItem, Source, Category, FeedSource, Filter, Alert, AlertHistory
+from .response_cache import bump_data_generation
+from .tasks import queue_filter_backfill
+
+
+class InvalidateResponseCacheMixin:
+    """Bump the response cache generation when objects are edited in the admin"""
+
+    def invalidate(self):
+        bump_data_generation()
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        self.invalidate()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self.invalidate()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        self.invalidate()
 
 
 @admin.register(NewsItem)
-class NewsItemAdmin(admin.ModelAdmin):
+class NewsItemAdmin(InvalidateResponseCacheMixin, admin.ModelAdmin):
     list_display = ['title', 'source', 'category', 'published_at', 'created_at']
     list_filter = ['source', 'category', 'published_at']
     search_fields = ['title', 'description', 'content']
     readonly_fields = ['created_at', 'updated_at']
 
 
+@admin.register(Source, Category)
+class DimensionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'key']
+    search_fields = ['name', 'key']
+    readonly_fields = ['key']
+
+
+@admin.register(FeedSource)
+class FeedSourceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'url', 'category', 'is_active', 'last_status', 'last_polled_at']
+    list_filter = ['is_active', 'category']
+    search_fields = ['name', 'url']
+    readonly_fields = ['etag', 'last_modified', 'last_polled_at', 'last_status', 'created_at', 'updated_at']
+
+
 @admin.register(Filter)
-class FilterAdmin(admin.ModelAdmin):
+class FilterAdmin(InvalidateResponseCacheMixin, admin.ModelAdmin):
     list_display = ['name', 'is_active', 'created_at']
     list_filter = ['is_active']
     search_fields = ['name']
 
+    def invalidate(self):
+        invalidate_filter_automaton()
+        super().invalidate()
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change or set(form.changed_data) & set(Filter.CRITERIA_FIELDS):
+            queue_filter_backfill(obj)
+
 
 @admin.register(Alert)
-class AlertAdmin(admin.ModelAdmin):
+class AlertAdmin(InvalidateResponseCacheMixin, admin.ModelAdmin):
     list_display = ['email', 'filter_criteria', 'frequency', 'is_active', 'last_sent']
     list_filter = ['frequency', 'is_active', 'last_sent']
     search_fields = ['email']
@@ -0,0 +1,201 @@
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .matching import FilterMatchIndex, invalidate_filter_automaton
+from .models import Alert, AlertHistory, Filter, NewsItem
+from .response_cache import bump_data_generation
+from .services import NewsStorageService, lock_news_ingest
+
+SYNTHETIC_DOMAIN = 'synthetic.example'
+SYNTHETIC_FILTER_PREFIX = 'synthetic:'
+
+TOPICS = [
+    'election', 'market', 'climate', 'energy', 'vaccine', 'football', 'startup',
+    'inflation', 'satellite', 'drought', 'merger', 'protest', 'tariff', 'galaxy',
+    'earthquake', 'semiconductor', 'olympics', 'wildfire', 'parliament', 'bitcoin',
+    'hospital', 'airline', 'railway', 'refugee', 'pipeline', 'lithium', 'vaccine trial',
+    'central bank', 'artificial intelligence', 'supply chain', 'heatwave', 'ceasefire',
+]
+FILLER = [
+    'the', 'a', 'of', 'report', 'new', 'says', 'after', 'over', 'year', 'world',
+    'officials', 'plan', 'record', 'amid', 'growth', 'talks', 'local', 'global',
+    'week', 'data', 'study', 'city', 'government', 'company', 'shares', 'deal',
+]
+SOURCES = [f'{prefix} {suffix}' for prefix in (
+    'Daily', 'Global', 'Metro', 'National', 'Evening', 'Morning', 'City', 'Tech',
+    'Business', 'Science',
+) for suffix in ('Times', 'Post', 'Herald', 'Wire', 'Journal', 'Tribune', 'Gazette', 'News')]
+CATEGORIES = ['business', 'entertainment', 'general', 'health', 'science', 'sports', 'technology']
+FREQUENCIES = [('immediate', 0.2), ('hourly', 0.3), ('daily', 0.5)]
+SYLLABLES = ['ka', 'lo', 'mi', 'ren', 'tor', 'vex', 'sa', 'dun', 'bel', 'qui', 'nor', 'zha', 'pel', 'mar', 'ix', 'ost']
+
+
+def entity_names(count, seed=0):
+    """Pseudo company, person and place names: the long tail most filters watch"""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        names.add(''.join(rng.choices(SYLLABLES, k=rng.randint(3, 4))))
+    return sorted(names)
+
+
+class CorpusGenerator:
+    """
+    Deterministic synthetic news, filters, alerts and history.
+
+    Articles follow a skewed topic distribution so that some filters match
+    far more than others, as in real traffic. Everything generated is tagged
+    (URLs and emails on SYNTHETIC_DOMAIN, filter names with
+    SYNTHETIC_FILTER_PREFIX) so it can be removed with clear().
+    """
+
+    def __init__(self, seed=0, days=7, entities=5000):
+        self.rng = random.Random(seed)
+        self.days = days
+        self.now = timezone.now()
+        # Zipf-like weights: a few hot topics and a long tail
+        self.topic_weights = [1 / (rank + 1) for rank in range(len(TOPICS))]
+        self.entities = entity_names(entities, seed=seed)
+
+    def _sentence(self, words, mentions=1):
+        body = self.rng.choices(FILLER, k=words)
+        body[self.rng.randrange(words)] = self.rng.choices(TOPICS, weights=self.topic_weights)[0]
+        for _ in range(mentions):
+            body[self.rng.randrange(words)] = self.rng.choice(self.entities)
+        return ' '.join(body)
+
+    def article(self, serial):
+        """Return one NewsAPI-style article dict"""
+        published = self.now - timedelta(seconds=self.rng.randrange(self.days * 86400))
+        return {
+            'title': self._sentence(10).capitalize(),
+            'description': self._sentence(30),
+            'content': self._sentence(80, mentions=2),
+            'url': f'https://{SYNTHETIC_DOMAIN}/{self.rng.getrandbits(64):016x}/{serial}',
+            'source': {'name': self.rng.choice(SOURCES)},
+            'author': f'Reporter {self.rng.randrange(500)}',
+            'publishedAt': published.isoformat(),
+            'category': self.rng.choice(CATEGORIES),
+        }
+
+    def articles(self, count, start=0):
+        return [self.article(start + i) for i in range(count)]
+
+    def generate_news(self, count, batch_size=5000, progress=None):
+        """Store count articles through the normal ingest path"""
+        stored = 0
+        for start in range(0, count, batch_size):
+            batch = self.articles(min(batch_size, count - start), start=start)
+            items, _ = NewsStorageService.bulk_store_news_items(batch, batch_size=batch_size)
+            stored += len(items)
+            if progress:
+                progress(stored)
+        return stored
+
+    def generate_filters(self, count, batch_size=5000):
+        """
+        Create synthetic filters. Their matches are only marked indexed when
+        there is no news yet (ingest then records every match); otherwise the
+        new filters are backfilled against the stored news.
+        """
+        filters = []
+        for i in range(count):
+            # Most filters watch specific entities; a few follow broad topics
+            vocabulary = TOPICS if self.rng.random() < 0.05 else self.entities
+            keywords = self.rng.sample(vocabulary, k=self.rng.choice([1, 1, 2, 3]))
+            sources = self.rng.sample(SOURCES, k=1) if self.rng.random() < 0.2 else []
+            categories = self.rng.sample(CATEGORIES, k=1) if self.rng.random() < 0.3 else []
+            filters.append(Filter(
+                name=f'{SYNTHETIC_FILTER_PREFIX}{i}',
+                keywords=keywords,
+                sources=[s.split()[0] for s in sources],
+                categories=categories,
+            ))
+        with transaction.atomic():
+            # Lock out concurrent ingest (see bulk_store_news_items) so no
+            # article can be stored between the check and the insert
+            lock_news_ingest()
+            indexed = not NewsItem.objects.exists()
+            for f in filters:
+                f.matches_indexed_at = self.now if indexed else None
+            Filter.objects.bulk_create(filters, batch_size=batch_size)
+        invalidate_filter_automaton()
+        if not indexed:
+            for f in Filter.objects.filter(name__startswith=SYNTHETIC_FILTER_PREFIX, matches_indexed_at__isnull=True):
+                FilterMatchIndex.backfill_filter(f)
+        bump_data_generation()
+        return len(filters)
+
+    def generate_alerts(self, count, batch_size=5000):
+        filter_ids = list(
+            Filter.objects.filter(name__startswith=SYNTHETIC_FILTER_PREFIX).values_list('id', flat=True)
+        )
+        if not filter_ids:
+            return 0
+        frequencies, weights = zip(*FREQUENCIES)
+        alerts = []
+        for i in range(count):
+            frequency = self.rng.choices(frequencies, weights=weights)[0]
+            last_sent = (
+                self.now - timedelta(minutes=self.rng.randrange(48 * 60))
+                if self.rng.random() < 0.7 else None
+            )
+            alerts.append(Alert(
+                # Several alerts share an address, as subscribers with many filters do
+                email=f'user{i // 4}@{SYNTHETIC_DOMAIN}',
+                filter_criteria_id=filter_ids[i % len(filter_ids)],
+                frequency=frequency,
+                last_sent=last_sent,
+                next_due_at=Alert.compute_next_due_at(frequency, last_sent),
+            ))
+        Alert.objects.bulk_create(alerts, batch_size=batch_size, ignore_conflicts=True)
+        return len(alerts)
+
+    def generate_history(self, count, batch_size=5000):
+        alert_ids = list(
+            Alert.objects.filter(email__endswith=f'@{SYNTHETIC_DOMAIN}').values_list('id', flat=True)
+        )
+        news_ids = list(
+            NewsItem.objects.filter(url__startswith=f'https://{SYNTHETIC_DOMAIN}/').values_list('id', flat=True)
+        )
+        if not alert_ids or not news_ids:
+            return 0
+        Through = AlertHistory.news_items.through
+        created = 0
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            histories = AlertHistory.objects.bulk_create([
+                AlertHistory(
+                    alert_id=self.rng.choice(alert_ids),
+                    email_status='sent' if self.rng.random() < 0.97 else 'failed',
+                )
+                for _ in range(size)
+            ])
+            Through.objects.bulk_create(
+                [
+                    Through(alerthistory_id=history.id, newsitem_id=self.rng.choice(news_ids))
+                    for history in histories
+                    for _ in range(self.rng.randint(1, 10))
+                ],
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+            # sent_at is auto_now_add, so spread it over the window afterwards
+            for history in histories:
+                history.sent_at = self.now - timedelta(seconds=self.rng.randrange(self.days * 86400))
+            AlertHistory.objects.bulk_update(histories, ['sent_at'], batch_size=batch_size)
+            created += size
+        return created
+
+    @staticmethod
+    def clear():
+        """Delete every synthetic row"""
+        AlertHistory.objects.filter(alert__email__endswith=f'@{SYNTHETIC_DOMAIN}').delete()
+        Alert.objects.filter(email__endswith=f'@{SYNTHETIC_DOMAIN}').delete()
+        Filter.objects.filter(name__startswith=SYNTHETIC_FILTER_PREFIX).delete()
+        NewsItem.objects.filter(url__startswith=f'https://{SYNTHETIC_DOMAIN}/').delete()
+        invalidate_filter_automaton()
+        bump_data_generation()
@@ -0,0 +1,99 @@
+from collections import namedtuple
+
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+MAX_ARTICLES_PER_DIGEST = 10
+
+RenderedDigest = namedtuple('RenderedDigest', ['subject', 'text', 'html'])
+
+
+class DigestRenderer:
+    """
+    Render alert digests once per (filter, article set).
+
+    Alerts that share a filter and receive the same articles get the same
+    subject and bodies, so each distinct digest is rendered once and only the
+    recipient headers differ between messages. Per-article fragments are
+    cached as well, so an article shared by several filters' digests is
+    rendered once per renderer.
+    """
+
+    def __init__(self):
+        self._digest_html = get_template('alerts/email/digest.html')
+        self._digest_text = get_template('alerts/email/digest.txt')
+        self._article_html = get_template('alerts/email/article.html')
+        self._article_text = get_template('alerts/email/article.txt')
+        self._consolidated_html = get_template('alerts/email/consolidated.html')
+        self._consolidated_text = get_template('alerts/email/consolidated.txt')
+        self._fragments = {}
+        self._digests = {}
+        self.renders = 0
+        self.reuses = 0
+
+    def render_article(self, item):
+        """Return the (html, text) fragments for one article"""
+        fragment = self._fragments.get(item.id)
+        if fragment is None:
+            context = {'item': item}
+            fragment = (
+                mark_safe(self._article_html.render(context)),
+                self._article_text.render(context).strip(),
+            )
+            self._fragments[item.id] = fragment
+        return fragment
+
+    def render(self, filter_criteria, news_items):
+        """Return the RenderedDigest for a filter and its articles"""
+        news_items = list(news_items)
+        count = len(news_items)
+        news_items = news_items[:MAX_ARTICLES_PER_DIGEST]
+        key = (filter_criteria.id, filter_criteria.name, count, tuple(item.id for item in news_items))
+        digest = self._digests.get(key)
+        if digest is not None:
+            self.reuses += 1
+            return digest
+
+        fragments = [self.render_article(item) for item in news_items]
+        context = {
+            'filter_name': filter_criteria.name,
+            'count': count,
+        }
+        digest = RenderedDigest(
+            subject=f"News Alert: {filter_criteria.name}",
+            text=self._digest_text.render({**context, 'fragments': [text for _, text in fragments]}).strip(),
+            html=self._digest_html.render({**context, 'fragments': [html for html, _ in fragments]}),
+        )
+        self._digests[key] = digest
+        self.renders += 1
+        return digest
+
+    def render_consolidated(self, sections):
+        """
+        Return one RenderedDigest for several filters sent to the same address.
+
+        sections is a list of (filter, news_items) pairs whose articles have
+        already been deduplicated across filters.
+        """
+        sections = [(f, list(items)[:MAX_ARTICLES_PER_DIGEST]) for f, items in sections]
+        key = ('consolidated', tuple((f.id, f.name, tuple(item.id for item in items)) for f, items in sections))
+        digest = self._digests.get(key)
+        if digest is not None:
+            self.reuses += 1
+            return digest
+
+        html_sections = []
+        text_sections = []
+        for f, items in sections:
+            fragments = [self.render_article(item) for item in items]
+            html_sections.append({'name': f.name, 'fragments': [html for html, _ in fragments]})
+            text_sections.append({'name': f.name, 'fragments': [text for _, text in fragments]})
+        count = sum(len(items) for _, items in sections)
+        digest = RenderedDigest(
+            subject=f"News Alert: {count} new article(s) for {', '.join(f.name for f, _ in sections)}"[:200],
+            text=self._consolidated_text.render({'count': count, 'sections': text_sections}).strip(),
+            html=self._consolidated_html.render({'count': count, 'sections': html_sections}),
+        )
+        self._digests[key] = digest
+        self.renders += 1
+        return digest
@@ -0,0 +1,112 @@
+import threading
+
+from django.db.models import Q
+
+from .models import Category, Source
+
+
+class DimensionCache:
+    """
+    In-process name -> id cache for a lookup table keyed by lowercased name.
+
+    Ids never change once assigned, so cached entries stay valid; a miss
+    falls through to the database. SQL predicates use the query_* subqueries
+    so rows created by other processes are always seen. Selections (the set of ids whose key
+    satisfies a filter criterion) are memoized and recomputed when an id the
+    cache has not seen turns up. Call clear() after rolling back a transaction
+    that created rows.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._ids = {}
+        self._keys = {}
+        self._selections = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(name):
+        return name.lower()
+
+    def clear(self):
+        with self._lock:
+            self._ids = {}
+            self._keys = {}
+            self._selections = {}
+            self._loaded = False
+
+    def _remember(self, key, dimension_id):
+        self._ids[key] = dimension_id
+        self._keys[dimension_id] = key
+
+    def ids_for(self, names):
+        """Return a dict mapping each non-empty name to its id, creating missing rows in bulk"""
+        names = {name for name in names if name}
+        missing = {self.key(name): name for name in names if self.key(name) not in self._ids}
+        if missing:
+            self.model.objects.bulk_create(
+                [self.model(name=name, key=key) for key, name in missing.items()],
+                ignore_conflicts=True,
+            )
+            with self._lock:
+                for key, dimension_id in self.model.objects.filter(key__in=list(missing)).values_list('key', 'id'):
+                    self._remember(key, dimension_id)
+                # New keys may satisfy criteria that were already selected
+                self._selections = {}
+        return {name: self._ids.get(self.key(name)) for name in names}
+
+    def id_for(self, name):
+        if not name:
+            return None
+        return self.ids_for([name])[name]
+
+    def _load(self):
+        with self._lock:
+            for key, dimension_id in self.model.objects.values_list('key', 'id'):
+                self._remember(key, dimension_id)
+            self._selections = {}
+            self._loaded = True
+
+    def _select(self, kind, values, predicate):
+        if not self._loaded:
+            self._load()
+        selection_key = (kind, values)
+        selection = self._selections.get(selection_key)
+        if selection is None:
+            selection = frozenset(
+                dimension_id for key, dimension_id in self._ids.items() if predicate(key)
+            )
+            self._selections[selection_key] = selection
+        return selection
+
+    def containing(self, substrings):
+        """Ids whose key contains any of the (case-insensitive) substrings"""
+        values = tuple(sorted({self.key(s) for s in substrings}))
+        return self._select('contains', values, lambda key: any(s in key for s in values))
+
+    def matching(self, names):
+        """Ids whose key equals any of the (case-insensitive) names"""
+        values = tuple(sorted({self.key(n) for n in names}))
+        return self._select('equals', values, lambda key: key in values)
+
+    def query_containing(self, substrings):
+        """Subquery of ids whose key contains any of the substrings, for SQL predicates that must see new rows"""
+        condition = Q()
+        for s in substrings:
+            condition |= Q(key__contains=self.key(s))
+        return self.model.objects.filter(condition).values('id')
+
+    def query_matching(self, names):
+        """Subquery of ids whose key equals any of the names"""
+        return self.model.objects.filter(key__in={self.key(n) for n in names}).values('id')
+
+    def is_known(self, dimension_id):
+        """Whether dimension_id is cached; reloads once so new rows become visible"""
+        if dimension_id not in self._keys:
+            self._load()
+        return dimension_id in self._keys
+
+
+sources = DimensionCache(Source)
+categories = DimensionCache(Category)
@@ -0,0 +1,246 @@
+import time
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db.models import Max, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .matching import article_records, get_filter_automaton
+from .metrics import registry
+from .models import Alert, AlertHistory, FilterMatch, NewsItem
+from .services import EmailAlertService, NewsFilterService
+
+logger = logging.getLogger(__name__)
+
+
+class AlertProcessingEngine:
+    """
+    Process every active alert against a single load of the news window.
+
+    Matches come from the materialized FilterMatch table, so only matched
+    articles are loaded, projected to the columns email rendering needs.
+    Filters whose matches are still being backfilled fall back to one scan of
+    the window, loaded as compact ArticleRecords (see matching.py). Due alerts are grouped by filter so that each distinct filter
+    is evaluated once, however many alerts share it.
+
+    Each alert keeps a high-water mark (last_processed_news_id), so a run only
+    considers articles ingested since that alert was last processed; the days
+    lookback still bounds the window by publication date.
+
+    Near-duplicate articles (see fingerprint.py) count as one story: a digest
+    includes at most one article per cluster, and a cluster already sent to an
+    alert is not sent again under another URL.
+    """
+
+    NEWS_FIELDS = (
+        'id', 'title', 'description', 'content', 'url', 'source',
+        'category', 'published_at', 'duplicate_of', 'source_ref', 'category_ref',
+    )
+    MAX_ITEMS_PER_ALERT = 10
+
+    def __init__(self, days=1):
+        self.days = days
+        self.timings = {}
+
+    @contextmanager
+    def _phase(self, name):
+        start = time.perf_counter()
+        try:
+            with registry.phase(f'engine.{name}'):
+                yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def load_news(self, since, after_id=0, up_to_id=None):
+        """Load the news window once, as ArticleRecords for the matchers"""
+        queryset = NewsItem.objects.filter(published_at__gte=since, id__gt=after_id)
+        if up_to_id is not None:
+            queryset = queryset.filter(id__lte=up_to_id)
+        return list(article_records(queryset))
+
+    @staticmethod
+    def cluster_key(item):
+        """Identify an item's near-duplicate cluster by its root article id"""
+        return item.duplicate_of_id or item.id
+
+    @classmethod
+    def already_sent(cls, alerts, news_items):
+        """Return the set of (alert_id, cluster_key) pairs already delivered, in one query"""
+        if not alerts or not news_items:
+            return set()
+        keys = {cls.cluster_key(item) for item in news_items}
+        Through = AlertHistory.news_items.through
+        return set(
+            Through.objects.filter(
+                Q(newsitem_id__in=keys) | Q(newsitem__duplicate_of_id__in=keys),
+                alerthistory__alert_id__in=[alert.id for alert in alerts],
+                alerthistory__email_status='sent',
+            )
+            .annotate(cluster=Coalesce('newsitem__duplicate_of_id', 'newsitem_id'))
+            .values_list('alerthistory__alert_id', 'cluster')
+        )
+
+    @classmethod
+    def collapse_duplicates(cls, news_items):
+        """Keep the first item of each near-duplicate cluster, preserving order"""
+        seen = set()
+        collapsed = []
+        for item in news_items:
+            key = cls.cluster_key(item)
+            if key not in seen:
+                seen.add(key)
+                collapsed.append(item)
+        return collapsed
+
+    def load_matches(self, filters, since, after_id=0, up_to_id=None):
+        """Read the materialized matches of indexed filters, loading only the matched articles"""
+        queryset = FilterMatch.objects.filter(
+            filter_id__in=[f.id for f in filters],
+            news_item__published_at__gte=since,
+            news_item_id__gt=after_id,
+        )
+        if up_to_id is not None:
+            queryset = queryset.filter(news_item_id__lte=up_to_id)
+
+        ids_by_filter = defaultdict(set)
+        for filter_id, news_item_id in queryset.values_list('filter_id', 'news_item_id'):
+            ids_by_filter[filter_id].add(news_item_id)
+        # Loaded in the model's newest-first order, which each filter's list keeps
+        news_items = NewsItem.objects.filter(id__in=queryset.values('news_item_id')).only(*self.NEWS_FIELDS)
+        by_id = {item.id: item for item in news_items}
+        position = {item_id: i for i, item_id in enumerate(by_id)}
+        return {
+            f.id: [by_id[i] for i in sorted(ids_by_filter[f.id] & by_id.keys(), key=position.get)]
+            for f in filters
+        }
+
+    def match(self, filters, since, after_id=0, up_to_id=None):
+        """
+        Return a dict mapping filter id to matching news items in the window.
+
+        Filters with indexed matches are read from FilterMatch; the window is
+        only loaded and scanned for filters still being backfilled, and each
+        of those is evaluated once.
+        """
+        indexed = [f for f in filters if f.matches_indexed_at is not None]
+        pending = [f for f in filters if f.matches_indexed_at is None]
+        matches = self.load_matches(indexed, since, after_id, up_to_id) if indexed else {}
+        if not pending:
+            return matches
+
+        news_items = self.load_news(since, after_id, up_to_id)
+        automaton = get_filter_automaton()
+        if any(f.id in automaton for f in pending):
+            found = automaton.match(news_items)
+            matches.update({f.id: found[f.id] for f in pending if f.id in automaton})
+        for f in pending:
+            if f.id not in automaton:
+                matches[f.id] = NewsFilterService.filter_news(news_items, f)
+        return matches
+
+    def plan(self):
+        """
+        Select due alerts and match them against the news window.
+
+        Returns a JSON-serializable plan that deliver() can execute, possibly
+        in another process: per-alert results that need no email, the news
+        item ids to send per alert, and the high-water mark to store.
+        """
+        self.timings = {}
+        now = timezone.now()
+        since = now - timedelta(days=self.days)
+        plan = {"results": [], "deliveries": [], "processed_ids": [], "high_water": 0, "timings": self.timings}
+
+        with self._phase('select_alerts'):
+            # Alerts that are not due yet are never loaded
+            due_by_filter = defaultdict(list)
+            for alert in Alert.due(now).select_related('filter_criteria'):
+                due_by_filter[alert.filter_criteria_id].append(alert)
+
+        if not due_by_filter:
+            return plan
+
+        due_alerts = [alert for alerts in due_by_filter.values() for alert in alerts]
+
+        with self._phase('match'):
+            # Safe as a cursor: NewsStorageService commits each batch together
+            # with its FilterMatch rows and serializes batches, so no smaller
+            # id can still commit after this is read
+            high_water = NewsItem.objects.aggregate(high_water=Max('id'))['high_water'] or 0
+            after_id = min(alert.last_processed_news_id or 0 for alert in due_alerts)
+            plan["high_water"] = high_water
+            filters = [alerts[0].filter_criteria for alerts in due_by_filter.values()]
+            matches = self.match(filters, since, after_id=after_id, up_to_id=high_water)
+            sent_pairs = self.already_sent(
+                due_alerts, {item for items in matches.values() for item in items}
+            )
+
+            for filter_id, alerts in due_by_filter.items():
+                filter_items = matches.get(filter_id, [])
+                for alert in alerts:
+                    cursor = alert.last_processed_news_id or 0
+                    filtered_items = self.collapse_duplicates(
+                        item for item in filter_items
+                        if item.id > cursor and (alert.id, self.cluster_key(item)) not in sent_pairs
+                    )
+                    if not filtered_items:
+                        plan["processed_ids"].append(alert.id)
+                        plan["results"].append({"alert_id": alert.id, "email": alert.email, "status": "no_news", "count": 0})
+                        continue
+                    plan["deliveries"].append({
+                        "alert_id": alert.id,
+                        "news_item_ids": [item.id for item in filtered_items[:self.MAX_ITEMS_PER_ALERT]],
+                        "count": len(filtered_items),
+                    })
+            registry.inc('news_alert_alerts_matched_total', len(plan["deliveries"]))
+
+        return plan
+
+    def deliver(self, plan):
+        """Send the emails in a plan, store high-water marks and return per-alert result dicts"""
+        self.timings = dict(plan.get("timings", {}))
+        results = list(plan["results"])
+        processed_ids = list(plan["processed_ids"])
+
+        with self._phase('send'):
+            deliveries = plan["deliveries"]
+            alerts = Alert.objects.select_related('filter_criteria').in_bulk(
+                [d["alert_id"] for d in deliveries]
+            )
+            items = NewsItem.objects.only(*self.NEWS_FIELDS).in_bulk(
+                [news_id for d in deliveries for news_id in d["news_item_ids"]]
+            )
+            batch = [
+                (alerts[d["alert_id"]], [items[i] for i in d["news_item_ids"] if i in items])
+                for d in deliveries if d["alert_id"] in alerts
+            ]
+            outcomes = EmailAlertService.send_batch(batch) if batch else {}
+
+            for d in deliveries:
+                alert = alerts.get(d["alert_id"])
+                if alert is None:
+                    continue
+                success = outcomes.get(alert.id, False)
+                if success:
+                    processed_ids.append(alert.id)
+                results.append({
+                    "alert_id": alert.id,
+                    "email": alert.email,
+                    "status": "sent" if success else "failed",
+                    "count": d["count"],
+                })
+
+        # Failed sends keep their cursor so the same articles are retried next run
+        if processed_ids and plan["high_water"]:
+            Alert.objects.filter(id__in=processed_ids).update(last_processed_news_id=plan["high_water"])
+
+        phase_summary = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in self.timings.items())
+        logger.info(f"Processed {len(results)} alerts ({phase_summary})")
+        return results
+
+    def run(self):
+        """Process all active alerts and return a list of per-alert result dicts"""
+        return self.deliver(self.plan())
@@ -0,0 +1,162 @@
+import hashlib
+
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Coalesce
+
+from .matching import TOKEN_RE
+from .models import NewsItem
+from .response_cache import bump_data_generation
+
+SIMHASH_BITS = 64
+BAND_BITS = 16
+BAND_COUNT = SIMHASH_BITS // BAND_BITS
+BAND_FIELDS = tuple(f'simhash_band_{i}' for i in range(BAND_COUNT))
+
+# With four bands, any two hashes at most three bits apart agree on at least
+# one whole band, so the band lookup never misses a pair within this distance.
+MAX_DISTANCE = BAND_COUNT - 1
+
+
+def _feature_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text):
+    """Return the unsigned 64-bit SimHash of text's lowercased word tokens, or None if it has none"""
+    tokens = TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return None
+    weights = [0] * SIMHASH_BITS
+    for token in tokens:
+        h = _feature_hash(token)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return value
+
+
+def to_signed(value):
+    """Map an unsigned 64-bit value into BigIntegerField range"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def hamming(a, b):
+    return bin(to_unsigned(a) ^ to_unsigned(b)).count('1')
+
+
+def fingerprint_fields(title, description):
+    """Return the NewsItem field values for the fingerprint of an article"""
+    value = simhash(f"{title or ''} {description or ''}")
+    if value is None:
+        return {'simhash': None, **{field: None for field in BAND_FIELDS}}
+    bands = {
+        field: (value >> (i * BAND_BITS)) & ((1 << BAND_BITS) - 1)
+        for i, field in enumerate(BAND_FIELDS)
+    }
+    return {'simhash': to_signed(value), **bands}
+
+
+def collapse_clusters(queryset):
+    """
+    Keep one article per near-duplicate cluster among the queryset's own rows.
+
+    The representative is the matching article with the lowest id, which is
+    the cluster root whenever the root itself matches; a cluster whose root
+    is filtered out is still represented by a matching duplicate.
+    """
+    queryset = queryset.annotate(cluster=Coalesce('duplicate_of_id', 'id'))
+    earlier = queryset.filter(
+        Q(id=OuterRef('cluster')) | Q(duplicate_of_id=OuterRef('cluster')),
+        id__lt=OuterRef('id'),
+    )
+    return queryset.filter(~Exists(earlier))
+
+
+class NearDuplicateClusterer:
+    """
+    Link near-duplicate articles into clusters using banded LSH on SimHash.
+
+    Candidates are found through the indexed band columns, so each lookup
+    touches only articles sharing a band rather than the whole table. A
+    matching article is linked to the earliest stored member of its cluster.
+    """
+
+    CANDIDATE_FIELDS = ('id', 'simhash', 'duplicate_of_id') + BAND_FIELDS
+
+    @staticmethod
+    def link(news_items):
+        """Set duplicate_of on the given stored items and return how many were linked"""
+        items = sorted((item for item in news_items if item.simhash is not None), key=lambda item: item.id)
+        if not items:
+            return 0
+
+        lookup = Q()
+        for field in BAND_FIELDS:
+            lookup |= Q(**{f'{field}__in': {getattr(item, field) for item in items}})
+        candidates = {
+            row['id']: row
+            for row in NewsItem.objects.filter(lookup).values(*NearDuplicateClusterer.CANDIDATE_FIELDS)
+        }
+
+        buckets = {}
+        for row in sorted(candidates.values(), key=lambda row: row['id']):
+            for field in BAND_FIELDS:
+                buckets.setdefault((field, row[field]), []).append(row)
+
+        linked = []
+        for item in items:
+            best = None
+            for field in BAND_FIELDS:
+                for row in buckets.get((field, getattr(item, field)), []):
+                    if row['id'] >= item.id or hamming(row['simhash'], item.simhash) > MAX_DISTANCE:
+                        continue
+                    root = row['duplicate_of_id'] or row['id']
+                    if best is None or root < best:
+                        best = root
+            if best is not None and best != item.duplicate_of_id:
+                item.duplicate_of_id = best
+                if item.id in candidates:
+                    candidates[item.id]['duplicate_of_id'] = best
+                linked.append(item)
+
+        if linked:
+            NewsItem.objects.bulk_update(linked, ['duplicate_of'], batch_size=500)
+        return len(linked)
+
+    @staticmethod
+    def rebuild(batch_size=1000):
+        """Recompute fingerprints and clusters for every stored news item"""
+        NewsItem.objects.update(duplicate_of=None)
+        fields = ['simhash', *BAND_FIELDS]
+
+        batch = []
+        queryset = NewsItem.objects.only('id', 'title', 'description').order_by('id')
+        for item in queryset.iterator(chunk_size=batch_size):
+            for name, value in fingerprint_fields(item.title, item.description).items():
+                setattr(item, name, value)
+            batch.append(item)
+            if len(batch) >= batch_size:
+                NewsItem.objects.bulk_update(batch, fields)
+                batch = []
+        if batch:
+            NewsItem.objects.bulk_update(batch, fields)
+
+        linked = 0
+        batch = []
+        queryset = NewsItem.objects.only('id', 'simhash', 'duplicate_of', *BAND_FIELDS).order_by('id')
+        for item in queryset.iterator(chunk_size=batch_size):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                linked += NearDuplicateClusterer.link(batch)
+                batch = []
+        if batch:
+            linked += NearDuplicateClusterer.link(batch)
+        bump_data_generation()
+        return linked
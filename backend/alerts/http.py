@@ -0,0 +1,68 @@
+import time
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class HostRateLimiter:
+    """Thread-safe limiter spacing requests to the same host at least 1/rate seconds apart"""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url):
+        """Block until a request to url's host is allowed"""
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def build_http_session(pool_size=None, max_retries=None, backoff_factor=None):
+    """Build a requests session with a connection pool and retry/backoff on transient errors"""
+    pool_size = pool_size or settings.NEWS_FETCH_CONCURRENCY
+    retry = Retry(
+        total=settings.NEWS_FETCH_MAX_RETRIES if max_retries is None else max_retries,
+        backoff_factor=settings.NEWS_FETCH_BACKOFF if backoff_factor is None else backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def get_http_session():
+    """Return the process-wide pooled session"""
+    with _shared_lock:
+        if 'session' not in _shared:
+            _shared['session'] = build_http_session()
+        return _shared['session']
+
+
+def get_rate_limiter():
+    """Return the process-wide per-host rate limiter"""
+    with _shared_lock:
+        if 'rate_limiter' not in _shared:
+            _shared['rate_limiter'] = HostRateLimiter(settings.NEWS_FETCH_RATE_LIMIT)
+        return _shared['rate_limiter']
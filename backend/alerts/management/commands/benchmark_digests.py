@@ -0,0 +1,130 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.html import strip_tags
+from alerts.digests import DigestRenderer
+from alerts.models import Alert, Filter, NewsItem
+from alerts.services import EmailAlertService
+
+
+class Command(BaseCommand):
+    help = 'Compare per-alert digest rendering with shared rendering for many recipients'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipients',
+            type=int,
+            help='Number of alerts to build messages for',
+            default=10000
+        )
+        parser.add_argument(
+            '--filters',
+            type=int,
+            help='Number of distinct filters the alerts are spread over',
+            default=50
+        )
+        parser.add_argument(
+            '--articles',
+            type=int,
+            help='Number of articles in each digest',
+            default=10
+        )
+
+    def handle(self, *args, **options):
+        recipients = options['recipients']
+        now = timezone.now()
+        # Unsaved objects: rendering needs no database
+        articles = [
+            NewsItem(
+                id=i,
+                title=f'Synthetic article {i} about markets & <policy>',
+                description='Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 5,
+                url=f'https://example.com/articles/{i}',
+                source=f'Source {i % 7}',
+                published_at=now - timedelta(minutes=i),
+            )
+            for i in range(1, options['filters'] + options['articles'] + 1)
+        ]
+        filters = [Filter(id=i + 1, name=f'Filter {i}') for i in range(options['filters'])]
+        # Neighbouring filters share most of their articles, as overlapping keywords do
+        digests = {
+            f.id: articles[i:i + options['articles']]
+            for i, f in enumerate(filters)
+        }
+        alerts = [
+            Alert(id=i + 1, email=f'user{i}@example.com', filter_criteria=filters[i % len(filters)])
+            for i in range(recipients)
+        ]
+
+        self.stdout.write(
+            f'Building {recipients} messages over {len(filters)} filters, '
+            f'{options["articles"]} articles each'
+        )
+
+        def run_before():
+            return [self._legacy_message(a, digests[a.filter_criteria_id]) for a in alerts]
+
+        def run_after():
+            renderer = DigestRenderer()
+            messages = [
+                EmailAlertService.build_message(a, digests[a.filter_criteria_id], renderer=renderer)
+                for a in alerts
+            ]
+            return messages, renderer
+
+        before = self._time(run_before)
+        after = self._time(run_after)
+        _, renderer = run_after()
+
+        scale = 10000 / recipients
+        self.stdout.write(f'Per-alert rendering: {before * scale:.3f}s per 10k recipients')
+        self.stdout.write(
+            f'Shared rendering: {after * scale:.3f}s per 10k recipients '
+            f'({renderer.renders} digests rendered, {renderer.reuses} reused)'
+        )
+        if after:
+            self.stdout.write(self.style.SUCCESS(f'Speedup: {before / after:.1f}x'))
+
+    @staticmethod
+    def _time(func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    @staticmethod
+    def _legacy_message(alert, news_items):
+        # The previous EmailAlertService.build_message: string concatenation and strip_tags per alert
+        html_message = f"""
+        <html>
+        <body>
+            <h2>News Alert: {alert.filter_criteria.name}</h2>
+            <p>You have {len(news_items)} new article(s) matching your criteria.</p>
+            <hr>
+        """
+        for item in news_items[:10]:
+            html_message += f"""
+            <div style="margin-bottom: 20px; padding: 10px; border: 1px solid #ddd;">
+                <h3><a href="{item.url}" target="_blank">{item.title}</a></h3>
+                <p><strong>Source:</strong> {item.source}</p>
+                <p><strong>Published:</strong> {item.published_at.strftime('%Y-%m-%d %H:%M')}</p>
+                {f'<p>{item.description[:200]}...</p>' if item.description else ''}
+            </div>
+            """
+        html_message += """
+            <hr>
+            <p><small>This is an automated news alert. To manage your alerts, please visit the news alert system.</small></p>
+        </body>
+        </html>
+        """
+        message = EmailMultiAlternatives(
+            subject=f"News Alert: {alert.filter_criteria.name}",
+            body=strip_tags(html_message),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[alert.email],
+        )
+        message.attach_alternative(html_message, 'text/html')
+        return message
@@ -0,0 +1,133 @@
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from alerts.matching import FilterAutomaton, IndexedFilterMatcher, article_records
+from alerts.models import Filter, NewsItem
+from alerts.services import NewsFilterService
+
+
+class Command(BaseCommand):
+    help = 'Compare SQL pre-filtering, the indexed and automaton keyword matchers and article records against the full-scan filter loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Number of days to look back for news',
+            default=1
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            help='Number of timed runs for each matcher',
+            default=3
+        )
+        parser.add_argument(
+            '--max-filters',
+            type=int,
+            help='Benchmark only the first N active filters',
+        )
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+        filters = Filter.objects.filter(is_active=True).order_by('id')
+        if options['max_filters']:
+            filters = filters[:options['max_filters']]
+        filters = list(filters)
+        window = NewsItem.objects.filter(published_at__gte=since)
+        
+        self.stdout.write(
+            f'Benchmarking {len(filters)} filters against {window.count()} news items'
+        )
+        
+        def run_scan():
+            # Mirrors process_alerts before the index: reload the window per filter
+            return {
+                f.id: [n.id for n in NewsFilterService.filter_news(list(window.all()), f)]
+                for f in filters
+            }
+        
+        def run_compiled():
+            # Source and category predicates run in SQL, keywords in Python
+            return {
+                f.id: [n.id for n in NewsFilterService.filter_news(window.all(), f)]
+                for f in filters
+            }
+        
+        def run_indexed():
+            matcher = IndexedFilterMatcher()
+            return {
+                f.id: [n.id for n in matcher.filter_news(window.all(), f)]
+                for f in filters
+            }
+        
+        def run_automaton():
+            matches = FilterAutomaton(filters).match(list(window.all()))
+            return {fid: [n.id for n in items] for fid, items in matches.items()}
+        
+        def run_automaton_records():
+            matches = FilterAutomaton(filters).match(list(article_records(window.all())))
+            return {fid: [r.id for r in records] for fid, records in matches.items()}
+        
+        def run_instances_once():
+            # The window loaded once as model instances, every filter scanning it
+            items = list(window.all())
+            return {f.id: [n.id for n in NewsFilterService.filter_news(items, f)] for f in filters}
+        
+        def run_records_once():
+            records = list(article_records(window.all()))
+            return {f.id: [r.id for r in NewsFilterService.filter_news(records, f)] for f in filters}
+        
+        instances_size = self._allocated(lambda: list(window.all()))
+        records_size = self._allocated(lambda: list(article_records(window.all())))
+        self.stdout.write(
+            f'Window in memory: {instances_size / 2**20:.1f} MiB as model instances, '
+            f'{records_size / 2**20:.1f} MiB as article records'
+        )
+        
+        scan_time, scan_result = self._time(run_scan, options['repeat'])
+        self.stdout.write(f'Full scan: {scan_time:.4f}s per run')
+        
+        variants = (
+            ('SQL pre-filter', run_compiled),
+            ('Indexed', run_indexed),
+            ('Automaton', run_automaton),
+            ('Automaton over records', run_automaton_records),
+            ('Scan of instances loaded once', run_instances_once),
+            ('Scan of records loaded once', run_records_once),
+        )
+        for label, func in variants:
+            elapsed, result = self._time(func, options['repeat'])
+            if result != scan_result:
+                mismatched = [fid for fid in scan_result if scan_result[fid] != result.get(fid)]
+                self.stdout.write(
+                    self.style.ERROR(f'{label} results differ for filters: {mismatched}')
+                )
+            speedup = f' ({scan_time / elapsed:.1f}x)' if elapsed else ''
+            self.stdout.write(f'{label}: {elapsed:.4f}s per run{speedup}')
+
+    @staticmethod
+    def _allocated(func):
+        """Bytes still allocated by func's result once it returns"""
+        tracemalloc.start()
+        try:
+            result = func()
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del result
+        return size
+
+    @staticmethod
+    def _time(func, repeat):
+        best = None
+        result = None
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,101 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from alerts.models import NewsItem, normalize_url
+from alerts.search import full_text_search_available, search_news, update_search_vectors
+
+WORDS = [
+    'election', 'market', 'climate', 'energy', 'vaccine', 'football', 'startup',
+    'inflation', 'satellite', 'drought', 'merger', 'protest', 'tariff', 'galaxy',
+    'earthquake', 'semiconductor', 'olympics', 'wildfire', 'parliament', 'bitcoin',
+    'the', 'a', 'of', 'report', 'new', 'says', 'after', 'over', 'year', 'world',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare full-text search against the icontains keyword path in news_list'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            help='Synthetic news items to insert for the run (rolled back afterwards)',
+            default=100000
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            help='Number of timed runs per query',
+            default=3
+        )
+
+    def handle(self, *args, **options):
+        queries = [['climate'], ['market', 'inflation'], ['semiconductor', 'tariff']]
+        
+        if not full_text_search_available():
+            self.stdout.write(
+                self.style.WARNING('Database is not PostgreSQL; search uses the icontains fallback')
+            )
+        
+        with transaction.atomic():
+            self._seed(options['rows'])
+            self.stdout.write(f'Benchmarking against {NewsItem.objects.count()} news items')
+            
+            for keywords in queries:
+                legacy = self._time(lambda: self._legacy(keywords), options['repeat'])
+                fts = self._time(lambda: self._search(keywords), options['repeat'])
+                speedup = f' ({legacy / fts:.1f}x)' if fts else ''
+                self.stdout.write(
+                    f'{",".join(keywords)}: icontains {legacy:.4f}s, search {fts:.4f}s{speedup}'
+                )
+            
+            transaction.set_rollback(True)
+
+    def _seed(self, rows):
+        rng = random.Random(0)
+        now = timezone.now()
+        start_id = (NewsItem.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+        batch = []
+        for i in range(rows):
+            url = f'https://bench.example.com/search/{start_id + i}'
+            batch.append(NewsItem(
+                title=' '.join(rng.choices(WORDS, k=8)),
+                description=' '.join(rng.choices(WORDS, k=30)),
+                url=url,
+                normalized_url=normalize_url(url),
+                source='Benchmark',
+                published_at=now,
+            ))
+            if len(batch) >= 5000:
+                NewsItem.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            NewsItem.objects.bulk_create(batch)
+        update_search_vectors(NewsItem.objects.filter(source='Benchmark').values('id'))
+
+    @staticmethod
+    def _legacy(keywords):
+        qs = NewsItem.objects.all()
+        for kw in keywords:
+            qs = qs.filter(Q(title__icontains=kw) | Q(description__icontains=kw))
+        return list(qs.order_by('-published_at', '-id').values_list('id', flat=True)[:20])
+
+    @staticmethod
+    def _search(keywords):
+        qs = search_news(NewsItem.objects.all(), ' '.join(keywords))
+        order = '-rank' if 'rank' in qs.query.annotations else '-published_at'
+        return list(qs.order_by(order, '-id').values_list('id', flat=True)[:20])
+
+    @staticmethod
+    def _time(func, repeat):
+        best = None
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import JsonResponse
+from alerts import serialization
+from alerts.models import NewsItem
+from alerts.serialization import FastJsonResponse
+from alerts.views import NEWS_ITEM_FIELDS, news_item_to_dict
+
+
+class Command(BaseCommand):
+    help = 'Compare model-instance and .values() serialization of large news list responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            help='Number of news items per response',
+            default=10000
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            help='Timed runs per variant; the best is reported',
+            default=3
+        )
+
+    def handle(self, *args, **options):
+        # Each run uses .all(), a fresh queryset, so no variant reads another's result cache
+        queryset = NewsItem.objects.order_by('-published_at', '-id')[:options['rows']]
+        rows = queryset.count()
+        if not rows:
+            self.stdout.write(self.style.WARNING('No news items; run generate_corpus first'))
+            return
+
+        def instances():
+            results = [news_item_to_dict(n) for n in queryset.all()]
+            return JsonResponse({'count': len(results), 'results': results})
+
+        def values():
+            results = list(queryset.all().values(*NEWS_ITEM_FIELDS))
+            return FastJsonResponse({'count': len(results), 'results': results})
+
+        variants = [('Model instances + JsonResponse', instances)]
+        if serialization.orjson is not None:
+            variants.append(('.values() + orjson', values))
+        variants.append(('.values() + stdlib json', lambda: self._without_orjson(values)))
+
+        self.stdout.write(f'Serializing {rows} news items, best of {options["repeat"]} runs')
+        baseline = None
+        for label, func in variants:
+            best = min(self._time(func) for _ in range(max(options['repeat'], 1)))
+            baseline = baseline or best
+            self.stdout.write(
+                f'{label}: {best:.3f}s, {rows / best:,.0f} rows/s ({baseline / best:.1f}x)'
+            )
+
+    @staticmethod
+    def _without_orjson(func):
+        saved, serialization.orjson = serialization.orjson, None
+        try:
+            return func()
+        finally:
+            serialization.orjson = saved
+
+    @staticmethod
+    def _time(func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from alerts.matching import FilterMatchIndex
+from alerts.models import Filter
+from alerts.response_cache import bump_data_generation
+
+
+class Command(BaseCommand):
+    help = 'Backfill the materialized filter matches for every filter (or only unindexed ones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--missing',
+            action='store_true',
+            help='Only backfill filters whose matches are not indexed yet'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Number of news items to scan per batch',
+            default=1000
+        )
+
+    def handle(self, *args, **options):
+        filters = Filter.objects.all()
+        if options['missing']:
+            filters = filters.filter(matches_indexed_at__isnull=True)
+
+        for f in filters:
+            matched = FilterMatchIndex.backfill_filter(f, batch_size=options['batch_size'])
+            if matched is None:
+                self.stdout.write(self.style.WARNING(f'{f.name}: edited during the backfill, skipped'))
+            else:
+                self.stdout.write(f'{f.name}: {matched} matches')
+        bump_data_generation()
+
+        self.stdout.write(
+            self.style.SUCCESS('Filter matches are up to date')
+        )
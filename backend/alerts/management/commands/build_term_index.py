@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from alerts.matching import TermIndex
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the keyword term index for all stored news items'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Number of news items to index per batch',
+            default=1000
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding term index...')
+        
+        indexed = TermIndex.rebuild(batch_size=options['batch_size'])
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {indexed} news items')
+        )
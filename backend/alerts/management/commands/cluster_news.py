@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from alerts.fingerprint import NearDuplicateClusterer
+
+
+class Command(BaseCommand):
+    help = 'Recompute SimHash fingerprints and near-duplicate clusters for all stored news items'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Number of news items to process per batch',
+            default=1000
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Clustering near-duplicate news...')
+        
+        linked = NearDuplicateClusterer.rebuild(batch_size=options['batch_size'])
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Linked {linked} news items to an earlier near-duplicate')
+        )
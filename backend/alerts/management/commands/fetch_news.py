@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from alerts.services import NewsAPIService, NewsStorageService
+from alerts.services import NewsFetchOrchestrator
 
 
 class Command(BaseCommand):
@@ -9,42 +9,57 @@ class Command(BaseCommand):
         parser.add_argument(
             '--category',
             type=str,
-            help='News category (e.g., technology, business, sports)',
+            action='append',
+            help='News category (e.g., technology, business, sports); may be repeated',
             default=None
         )
         parser.add_argument(
             '--query',
             type=str,
-            help='Search query for news',
+            action='append',
+            help='Search query for news; may be repeated',
+            default=None
+        )
+        parser.add_argument(
+            '--country',
+            type=str,
+            action='append',
+            help='Country code for top headlines (default: us); may be repeated',
             default=None
         )
         parser.add_argument(
             '--page-size',
             type=int,
-            help='Number of articles to fetch',
+            help='Number of articles to fetch per request',
             default=100
         )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='Number of requests to run at the same time',
+            default=None
+        )
 
     def handle(self, *args, **options):
-        category = options['category']
-        query = options['query']
+        categories = options['category']
+        queries = options['query']
+        countries = options['country']
         page_size = options['page_size']
 
         self.stdout.write('Fetching news...')
         
-        news_service = NewsAPIService()
-        
-        if query:
-            articles = news_service.fetch_everything(query=query, page_size=page_size)
-        else:
-            articles = news_service.fetch_top_headlines(category=category, page_size=page_size)
+        orchestrator = NewsFetchOrchestrator(concurrency=options['concurrency'])
+        articles = orchestrator.fetch(
+            categories=categories, queries=queries, countries=countries, page_size=page_size
+        )
         
         self.stdout.write(f'Fetched {len(articles)} articles')
         
-        storage_service = NewsStorageService()
-        stored_items = storage_service.store_news_items(articles)
+        stored_items, stats = orchestrator.store(articles)
         
         self.stdout.write(
-            self.style.SUCCESS(f'Successfully stored {len(stored_items)} news items')
+            self.style.SUCCESS(
+                f'Successfully stored {len(stored_items)} news items '
+                f'({stats["inserted"]} inserted, {stats["skipped"]} skipped)'
+            )
         )
-
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from alerts.feeds import FeedSourceService
+from alerts.models import FeedSource
+
+
+class Command(BaseCommand):
+    help = 'Poll RSS/Atom feed sources and store new articles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--add',
+            type=str,
+            action='append',
+            help='Register a feed URL before polling; may be repeated',
+            default=None
+        )
+        parser.add_argument(
+            '--category',
+            type=str,
+            help='Category for feeds registered with --add',
+            default=None
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='Number of feeds to fetch at the same time',
+            default=None
+        )
+
+    def handle(self, *args, **options):
+        for url in options['add'] or []:
+            FeedSource.objects.get_or_create(url=url, defaults={'category': options['category']})
+        
+        self.stdout.write('Polling feeds...')
+        
+        summary = FeedSourceService(concurrency=options['concurrency']).poll()
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Polled {summary["feeds"]} feeds: {summary["modified"]} changed, '
+                f'{summary["not_modified"]} unchanged, {summary["errors"]} errors; '
+                f'{summary["inserted"]} articles inserted, {summary["skipped"]} skipped'
+            )
+        )
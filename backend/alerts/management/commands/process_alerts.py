@@ -1,8 +1,5 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from datetime import timedelta
-from alerts.models import Alert
-from alerts.services import NewsFilterService, EmailAlertService
+from alerts.engine import AlertProcessingEngine
 
 
 class Command(BaseCommand):
@@ -18,66 +15,34 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         days = options['days']
-        since = timezone.now() - timedelta(days=days)
         
         self.stdout.write('Processing alerts...')
         
-        active_alerts = Alert.objects.filter(is_active=True)
-        self.stdout.write(f'Found {active_alerts.count()} active alerts')
-        
-        filter_service = NewsFilterService()
-        email_service = EmailAlertService()
+        engine = AlertProcessingEngine(days=days)
+        results = engine.run()
         
         sent_count = 0
-        skipped_count = 0
+        no_news_count = 0
         failed_count = 0
         
-        for alert in active_alerts:
-            # Check frequency
-            should_send = False
-            
-            if alert.frequency == 'immediate':
-                should_send = True
-            elif alert.frequency == 'hourly':
-                if not alert.last_sent or \
-                   (timezone.now() - alert.last_sent) >= timedelta(hours=1):
-                    should_send = True
-            elif alert.frequency == 'daily':
-                if not alert.last_sent or \
-                   (timezone.now() - alert.last_sent) >= timedelta(days=1):
-                    should_send = True
-            
-            if not should_send:
-                skipped_count += 1
-                continue
-            
-            # Get news items
-            from alerts.models import NewsItem
-            news_items = list(NewsItem.objects.filter(published_at__gte=since))
-            
-            # Apply filter
-            filtered_items = filter_service.filter_news(news_items, alert.filter_criteria)
-            
-            if not filtered_items:
-                skipped_count += 1
-                continue
-            
-            # Send email
-            success = email_service.send_alert(alert, filtered_items[:10])
-            
-            if success:
+        for result in results:
+            if result['status'] == 'sent':
                 sent_count += 1
-                self.stdout.write(f'Sent alert to {alert.email}')
-            else:
+                self.stdout.write(f"Sent alert to {result['email']}")
+            elif result['status'] == 'failed':
                 failed_count += 1
                 self.stdout.write(
-                    self.style.ERROR(f'Failed to send alert to {alert.email}')
+                    self.style.ERROR(f"Failed to send alert to {result['email']}")
                 )
+            else:
+                no_news_count += 1
+        
+        for phase, seconds in engine.timings.items():
+            self.stdout.write(f'{phase}: {seconds:.3f}s')
         
         self.stdout.write(
             self.style.SUCCESS(
-                f'Processed alerts: {sent_count} sent, '
-                f'{skipped_count} skipped, {failed_count} failed'
+                f'Processed due alerts: {sent_count} sent, '
+                f'{no_news_count} without news, {failed_count} failed'
             )
         )
-
@@ -0,0 +1,177 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from alerts.corpus import SYNTHETIC_FILTER_PREFIX, CorpusGenerator
+from alerts.dimensions import categories, sources
+from alerts.engine import AlertProcessingEngine
+from alerts.models import Alert, AlertHistory, Filter, NewsItem
+from alerts.services import NewsFilterService, NewsStorageService
+
+
+class Command(BaseCommand):
+    help = 'Time ingest, matching, alert processing and the read endpoints on the current data; write JSON results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Where to write the JSON results', default='benchmark-results.json')
+        parser.add_argument('--compare', help='Earlier results file to compare medians against')
+        parser.add_argument('--repeat', type=int, help='Timed runs per benchmark', default=3)
+        parser.add_argument('--ingest', type=int, help='Articles stored per ingest run (rolled back)', default=1000)
+        parser.add_argument('--sample-filters', type=int, help='Filters used by the matching and apply benchmarks', default=20)
+        parser.add_argument('--days', type=int, help='News window for matching and alert processing', default=7)
+        parser.add_argument(
+            '--only',
+            action='append',
+            help='Run only the named benchmark (may be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = max(options['repeat'], 1)
+        self.days = options['days']
+        self.client = Client()
+        filters = self._sample_filters(options['sample_filters'])
+        window = NewsItem.objects.filter(published_at__gte=timezone.now() - timezone.timedelta(days=self.days))
+
+        benchmarks = {
+            'store_news_items': lambda run: self._rolled_back(
+                lambda: NewsStorageService.store_news_items(self._fresh_articles(run, options['ingest']))
+            ),
+            'filter_news': lambda run: [NewsFilterService.filter_news(window.all(), f) for f in filters],
+            'process_alerts': lambda run: self._rolled_back(lambda: AlertProcessingEngine(days=self.days).run()),
+            'news_list': lambda run: self._get('/api/news/?page_size=20'),
+            'news_list_source': lambda run: self._get('/api/news/?page_size=20&source=daily'),
+            'news_list_search': lambda run: self._get('/api/news/?page_size=20&search=climate'),
+            'filter_apply': lambda run: [
+                self._post(f'/api/filters/{f.id}/apply/', {'days': self.days}) for f in filters
+            ],
+            'alert_history_list': lambda run: self._get('/api/alert-history/?page_size=50'),
+        }
+        if options['only']:
+            unknown = set(options['only']) - set(benchmarks)
+            if unknown:
+                self.stderr.write(self.style.ERROR(f'Unknown benchmarks: {", ".join(sorted(unknown))}'))
+                return
+            benchmarks = {name: func for name, func in benchmarks.items() if name in options['only']}
+
+        results = {}
+        # The response cache would turn repeated requests into cache hits; measure the real work
+        overrides = {
+            'RESPONSE_CACHE_ENABLED': False,
+            'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+            'ALLOWED_HOSTS': ['*'],
+        }
+        with override_settings(**overrides):
+            for name, func in benchmarks.items():
+                runs = []
+                for run in range(self.repeat):
+                    start = time.perf_counter()
+                    func(run)
+                    runs.append(time.perf_counter() - start)
+                results[name] = {
+                    'runs': runs,
+                    'min': min(runs),
+                    'median': statistics.median(runs),
+                    'mean': statistics.mean(runs),
+                }
+                self.stdout.write(f'{name}: median {results[name]["median"]:.4f}s over {len(runs)} runs')
+
+        report = {
+            'commit': self._git_commit(),
+            'timestamp': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'platform': platform.platform(),
+                'database': connection.vendor,
+            },
+            'parameters': {
+                'repeat': self.repeat,
+                'ingest': options['ingest'],
+                'sample_filters': len(filters),
+                'days': self.days,
+            },
+            'corpus': {
+                'news_items': NewsItem.objects.count(),
+                'filters': Filter.objects.count(),
+                'alerts': Alert.objects.count(),
+                'alert_history': AlertHistory.objects.count(),
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
+
+        if options['compare']:
+            self._compare(options['compare'], results)
+
+    def _sample_filters(self, count):
+        queryset = Filter.objects.filter(name__startswith=SYNTHETIC_FILTER_PREFIX)
+        if not queryset.exists():
+            queryset = Filter.objects.all()
+        return list(queryset.order_by('id')[:count])
+
+    def _fresh_articles(self, run, count):
+        # A distinct seed per run keeps every URL new, so each run inserts
+        generator = CorpusGenerator(seed=1000 + run, days=self.days)
+        offset = (NewsItem.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+        articles = generator.articles(count, start=offset)
+        for article in articles:
+            article['url'] = article['url'].replace('synthetic.example/', 'synthetic.example/bench/', 1)
+        return articles
+
+    @staticmethod
+    def _rolled_back(func):
+        with transaction.atomic():
+            func()
+            transaction.set_rollback(True)
+        # Rows created inside the rolled-back transaction must not stay cached
+        sources.clear()
+        categories.clear()
+
+    def _get(self, path):
+        response = self.client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {path} returned {response.status_code}')
+        return response.content
+
+    def _post(self, path, data):
+        response = self.client.post(path, json.dumps(data), content_type='application/json')
+        if response.status_code != 200:
+            raise RuntimeError(f'POST {path} returned {response.status_code}')
+        return response.content
+
+    @staticmethod
+    def _git_commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _compare(self, path, results):
+        with open(path) as f:
+            previous = json.load(f)
+        self.stdout.write(f'Compared with {path} (commit {previous.get("commit")}):')
+        for name, result in results.items():
+            before = previous.get('results', {}).get(name)
+            if not before:
+                self.stdout.write(f'  {name}: no earlier result')
+                continue
+            ratio = result['median'] / before['median'] if before['median'] else float('inf')
+            style = self.style.ERROR if ratio > 1.1 else self.style.SUCCESS if ratio < 0.9 else str
+            self.stdout.write(style(
+                f'  {name}: {before["median"]:.4f}s -> {result["median"]:.4f}s ({ratio:.2f}x)'
+            ))
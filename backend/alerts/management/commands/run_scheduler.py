@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from alerts.scheduler import AlertScheduler
+
+
+class Command(BaseCommand):
+    help = 'Run a long-lived scheduler that processes alerts as they become due or new news arrives'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Number of days to look back for news',
+            default=1
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=float,
+            help='Longest wait between runs, in seconds',
+            default=300
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='Seconds between new-article checks on databases without LISTEN/NOTIFY',
+            default=5
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Starting alert scheduler...')
+        
+        scheduler = AlertScheduler(
+            days=options['days'],
+            max_sleep=options['max_sleep'],
+            poll_interval=options['poll_interval'],
+        )
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Scheduler stopped'))
@@ -0,0 +1,393 @@
+import re
+import logging
+from collections import deque
+
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import Filter, FilterMatch, IndexTerm, NewsItem
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Tokens longer than the term column are not stored verbatim. Articles that
+# contain one are tagged with OVERFLOW_TERM instead and are always treated as
+# candidates, so the index never drops a match the substring scan would find.
+TERM_MAX_LENGTH = 100
+OVERFLOW_TERM = ''
+
+
+class ArticleRecord:
+    """
+    The part of a news item that matching reads, with the searchable text
+    lowercased once.
+
+    Records are built from values_list() rows, so no model instance, field
+    descriptors or _state are created, and the text is not rebuilt for every
+    filter. Attribute names follow NewsItem, so source_matches,
+    category_matches and the engine's cluster_key accept either.
+    """
+
+    __slots__ = ('id', 'text', 'source', 'category', 'source_ref_id', 'category_ref_id', 'duplicate_of_id')
+
+    FIELDS = (
+        'id', 'title', 'description', 'content', 'source', 'category',
+        'source_ref', 'category_ref', 'duplicate_of',
+    )
+
+    def __init__(self, id, text, source, category, source_ref_id=None, category_ref_id=None, duplicate_of_id=None):
+        self.id = id
+        self.text = text
+        self.source = source
+        self.category = category
+        self.source_ref_id = source_ref_id
+        self.category_ref_id = category_ref_id
+        self.duplicate_of_id = duplicate_of_id
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a record from a values_list(*ArticleRecord.FIELDS) row"""
+        id, title, description, content, source, category, source_ref_id, category_ref_id, duplicate_of_id = row
+        return cls(
+            id, f"{title} {description or ''} {content or ''}".lower(), source, category,
+            source_ref_id, category_ref_id, duplicate_of_id,
+        )
+
+    @classmethod
+    def from_item(cls, item):
+        return cls(
+            item.id, searchable_text(item), item.source, item.category,
+            item.source_ref_id, item.category_ref_id, item.duplicate_of_id,
+        )
+
+    def __repr__(self):
+        return f'<ArticleRecord {self.id}>'
+
+
+def article_records(queryset, chunk_size=2000):
+    """Iterate a NewsItem queryset as ArticleRecords, in the queryset's order"""
+    for row in queryset.values_list(*ArticleRecord.FIELDS).iterator(chunk_size=chunk_size):
+        yield ArticleRecord.from_row(row)
+
+
+def searchable_text(item):
+    """Return the lowercased text that keyword matching runs against"""
+    if isinstance(item, ArticleRecord):
+        return item.text
+    return f"{item.title} {item.description or ''} {item.content or ''}".lower()
+
+
+def tokenize(text):
+    """Split already-lowercased text into the set of index terms"""
+    terms = set()
+    for token in TOKEN_RE.findall(text):
+        terms.add(token if len(token) <= TERM_MAX_LENGTH else OVERFLOW_TERM)
+    return terms
+
+
+class TermIndex:
+    """Persisted inverted index from lowercased tokens to news items"""
+
+    @staticmethod
+    def index_items(news_items, batch_size=1000):
+        """Add index entries for the given news items"""
+        item_terms = {item.id: tokenize(searchable_text(item)) for item in news_items}
+        all_terms = set().union(*item_terms.values()) if item_terms else set()
+        if not all_terms:
+            return 0
+
+        IndexTerm.objects.bulk_create(
+            [IndexTerm(term=term) for term in all_terms],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        term_ids = {}
+        term_list = list(all_terms)
+        for start in range(0, len(term_list), batch_size):
+            chunk = term_list[start:start + batch_size]
+            term_ids.update(
+                IndexTerm.objects.filter(term__in=chunk).values_list('term', 'id')
+            )
+
+        Through = IndexTerm.news_items.through
+        links = [
+            Through(indexterm_id=term_ids[term], newsitem_id=item_id)
+            for item_id, terms in item_terms.items()
+            for term in terms
+        ]
+        Through.objects.bulk_create(links, batch_size=batch_size, ignore_conflicts=True)
+        return len(links)
+
+    @staticmethod
+    def rebuild(batch_size=1000):
+        """Drop and rebuild the index for every stored news item"""
+        IndexTerm.news_items.through.objects.all().delete()
+        IndexTerm.objects.all().delete()
+
+        indexed = 0
+        batch = []
+        queryset = NewsItem.objects.only('id', 'title', 'description', 'content').order_by('id')
+        for record in article_records(queryset, chunk_size=batch_size):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                TermIndex.index_items(batch, batch_size=batch_size)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            TermIndex.index_items(batch, batch_size=batch_size)
+            indexed += len(batch)
+        return indexed
+
+
+class IndexedFilterMatcher:
+    """
+    Match filters against news items using the term index.
+
+    A keyword can only occur in an article if its longest token is a substring
+    of one of the article's tokens, so the terms containing that token (found
+    by the database, through a trigram index on PostgreSQL) yield a superset
+    of the matching articles. Candidates are then verified with
+    NewsFilterService.filter_news, which keeps the exact substring semantics
+    of the original loop.
+    """
+
+    @staticmethod
+    def candidate_terms(filter_criteria):
+        """
+        Return a Q selecting the index terms whose articles may match the
+        filter's keywords, or None when every article is a candidate.
+        """
+        if not filter_criteria.keywords:
+            return None
+
+        terms = Q(term=OVERFLOW_TERM)
+        for keyword in filter_criteria.keywords:
+            tokens = TOKEN_RE.findall(keyword.lower())
+            if not tokens:
+                # Punctuation-only or empty keywords cannot be looked up
+                return None
+            terms |= Q(term__contains=max(tokens, key=len))
+        return terms
+
+    def candidate_ids(self, filter_criteria):
+        """
+        Return a queryset of candidate news item ids for the filter, or None
+        when the index cannot narrow the search.
+        """
+        terms = self.candidate_terms(filter_criteria)
+        if terms is None:
+            return None
+        return (
+            IndexTerm.news_items.through.objects
+            .filter(indexterm_id__in=IndexTerm.objects.filter(terms).values('id'))
+            .values('newsitem_id')
+        )
+
+    def filter_news(self, news_items, filter_criteria):
+        """Filter a NewsItem queryset, narrowing it through the index first"""
+        from .services import NewsFilterService
+
+        if not filter_criteria:
+            return list(news_items)
+
+        candidates = self.candidate_ids(filter_criteria)
+        if candidates is not None:
+            news_items = news_items.filter(id__in=candidates)
+        return NewsFilterService.filter_news(news_items, filter_criteria)
+
+
+class FilterAutomaton:
+    """
+    Aho-Corasick automaton over the keywords of a set of filters.
+
+    Each article's searchable text is scanned once and yields every filter
+    with a keyword hit; source and category checks are applied afterwards.
+    """
+
+    def __init__(self, filters):
+        self.filters = {f.id: f for f in filters}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [frozenset()]
+        # Filters with no keywords, or with an empty keyword, pass the keyword check for every article
+        self._always = set()
+
+        outputs = [set()]
+        for f in self.filters.values():
+            if not f.keywords:
+                self._always.add(f.id)
+                continue
+            for keyword in f.keywords:
+                pattern = keyword.lower()
+                if not pattern:
+                    self._always.add(f.id)
+                    continue
+                state = 0
+                for ch in pattern:
+                    next_state = self._goto[state].get(ch)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][ch] = next_state
+                        self._goto.append({})
+                        self._fail.append(0)
+                        outputs.append(set())
+                    state = next_state
+                outputs[state].add(f.id)
+        self._build_failure_links(outputs)
+
+    def _build_failure_links(self, outputs):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                outputs[next_state] |= outputs[self._fail[next_state]]
+        self._out = [frozenset(ids) for ids in outputs]
+
+    def __contains__(self, filter_id):
+        return filter_id in self.filters
+
+    def match_text(self, text):
+        """Return ids of filters whose keywords occur in the lowercased text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(self._always)
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+    def match(self, news_items):
+        """Return a dict mapping filter id to the matching news items, in input order"""
+        from .services import NewsFilterService
+
+        results = {filter_id: [] for filter_id in self.filters}
+        for item in news_items:
+            for filter_id in self.match_text(searchable_text(item)):
+                f = self.filters[filter_id]
+                if (NewsFilterService.source_matches(item, f)
+                        and NewsFilterService.category_matches(item, f)):
+                    results[filter_id].append(item)
+        return results
+
+
+_automaton_cache = {}
+
+
+def filter_version():
+    """
+    A value that changes whenever any filter is created, edited or deleted.
+
+    Read from the Filter table rather than a cache, so every process (web,
+    Celery workers, the scheduler, management commands) sees changes made by
+    any other: saves move Max(updated_at), creations move Max(id) and
+    deletions lower the count.
+    """
+    version = Filter.objects.aggregate(updated=Max('updated_at'), last_id=Max('id'), count=Count('id'))
+    return version['updated'], version['last_id'], version['count']
+
+
+def get_filter_automaton(include_inactive=False):
+    """Return the compiled automaton for all active (or all) filters, rebuilding it if filters changed"""
+    version = filter_version()
+    cached_version, automaton = _automaton_cache.get(include_inactive, (None, None))
+    if automaton is None or cached_version != version:
+        filters = Filter.objects.all() if include_inactive else Filter.objects.filter(is_active=True)
+        automaton = FilterAutomaton(filters)
+        _automaton_cache[include_inactive] = (version, automaton)
+        logger.info(f"Compiled filter automaton (version {version}, include_inactive={include_inactive})")
+    return automaton
+
+
+def invalidate_filter_automaton():
+    """Drop this process's compiled automata; other processes notice the change through filter_version()"""
+    _automaton_cache.clear()
+
+
+class FilterMatchIndex:
+    """
+    Maintain the materialized FilterMatch table.
+
+    New articles are matched against every filter once, when they are stored;
+    a filter whose criteria change is backfilled on its own. Previews and
+    alert sending then read matches with an indexed join instead of
+    re-scanning the news window.
+    """
+
+    @staticmethod
+    def index_items(news_items, batch_size=1000):
+        """Record matches of the given stored news items against all filters"""
+        matches = get_filter_automaton(include_inactive=True).match(news_items)
+        rows = [
+            FilterMatch(filter_id=filter_id, news_item_id=item.id)
+            for filter_id, items in matches.items()
+            for item in items
+        ]
+        FilterMatch.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+        return len(rows)
+
+    @staticmethod
+    def backfill_filter(filter_criteria, batch_size=1000):
+        """
+        Replace the stored matches of one filter and mark it indexed.
+
+        Matches are collected first and swapped in with one transaction, and
+        only if the filter's criteria are still the ones that were scanned;
+        when an edit raced the scan, the result is discarded (the edit queued
+        its own backfill) and None is returned.
+        """
+        from .services import NewsFilterService
+
+        # Ingest commits ids in order, so newer articles get their matches
+        # recorded by FilterMatchIndex.index_items and are left alone here
+        high_water = NewsItem.objects.aggregate(high_water=Max('id'))['high_water'] or 0
+        queryset = NewsItem.objects.filter(id__lte=high_water).order_by('id')
+        candidates = IndexedFilterMatcher().candidate_ids(filter_criteria)
+        if candidates is not None:
+            queryset = queryset.filter(id__in=candidates)
+        queryset = NewsFilterService.compile(filter_criteria, queryset)
+
+        matched_ids = []
+        batch = []
+        for record in article_records(queryset, chunk_size=batch_size):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                matched_ids.extend(item.id for item in NewsFilterService.filter_news(batch, filter_criteria))
+                batch = []
+        if batch:
+            matched_ids.extend(item.id for item in NewsFilterService.filter_news(batch, filter_criteria))
+
+        criteria = [getattr(filter_criteria, field) for field in Filter.CRITERIA_FIELDS]
+        with transaction.atomic():
+            current = Filter.objects.select_for_update().filter(id=filter_criteria.id).first()
+            if current is None or [getattr(current, field) for field in Filter.CRITERIA_FIELDS] != criteria:
+                logger.info(f"Discarded backfill of filter {filter_criteria.id}: criteria changed during the scan")
+                return None
+            FilterMatch.objects.filter(filter_id=filter_criteria.id, news_item_id__lte=high_water).delete()
+            FilterMatch.objects.bulk_create(
+                [FilterMatch(filter_id=filter_criteria.id, news_item_id=item_id) for item_id in matched_ids],
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+            Filter.objects.filter(id=filter_criteria.id).update(matches_indexed_at=timezone.now())
+        return len(matched_ids)
+
+    @staticmethod
+    def matched_news(filter_criteria, queryset=None):
+        """
+        Return the filter's matches as a NewsItem queryset (optionally narrowed
+        from queryset), or None while the filter's matches are not yet indexed.
+        """
+        if filter_criteria.matches_indexed_at is None:
+            return None
+        queryset = NewsItem.objects.all() if queryset is None else queryset
+        return queryset.filter(filter_matches__filter=filter_criteria)
@@ -0,0 +1,218 @@
+import os
+import socket
+import threading
+import time
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+from .response_cache import get_cache, response_cache_stats
+
+logger = logging.getLogger(__name__)
+
+PROCESSES_KEY = 'alerts:metrics:processes'
+PROCESS_KEY_PREFIX = 'alerts:metrics:process:'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'news_alert_http_requests_total': (
+        'counter', 'HTTP requests by view, method and status', None),
+    'news_alert_http_request_duration_seconds': (
+        'histogram', 'Time spent handling a request', DURATION_BUCKETS),
+    'news_alert_http_request_db_queries': (
+        'histogram', 'Database queries per request', QUERY_BUCKETS),
+    'news_alert_http_request_db_duration_seconds': (
+        'histogram', 'Time spent in database queries per request', DURATION_BUCKETS),
+    'news_alert_http_response_size_bytes': (
+        'histogram', 'Response body size', SIZE_BUCKETS),
+    'news_alert_phase_duration_seconds': (
+        'histogram', 'Time spent in a pipeline phase (fetch, store, match, send)', DURATION_BUCKETS),
+    'news_alert_phase_db_queries_total': (
+        'counter', 'Database queries issued inside a pipeline phase', None),
+    'news_alert_phase_errors_total': (
+        'counter', 'Pipeline phases that raised', None),
+    'news_alert_articles_fetched_total': (
+        'counter', 'Unique articles returned by fetches', None),
+    'news_alert_articles_stored_total': (
+        'counter', 'Articles passed to storage, by result (inserted or skipped)', None),
+    'news_alert_alerts_matched_total': (
+        'counter', 'Alerts with at least one new article in an engine run', None),
+    'news_alert_emails_total': (
+        'counter', 'Alert deliveries by status (sent or failed)', None),
+}
+
+
+class QueryCounter:
+    """connection.execute_wrapper that counts queries and their total time"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms, published through the shared cache.
+
+    Recording only updates dicts under a lock. At most every
+    METRICS_FLUSH_INTERVAL seconds a process writes its cumulative snapshot
+    to the cache (one set), and the metrics endpoint sums the snapshots of
+    every process, so web workers and Celery workers all show up when the
+    cache is shared (Redis). Snapshots expire after METRICS_PROCESS_TTL, so
+    counters from a process that has gone away eventually drop out, which
+    Prometheus treats as a counter reset.
+    """
+
+    def __init__(self):
+        self.process_id = f'{socket.gethostname()}:{os.getpid()}'
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    @staticmethod
+    def _labels(labels):
+        return tuple(sorted(labels.items())) if labels else ()
+
+    def inc(self, name, value=1, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        buckets = METRICS[name][2]
+        key = (name, self._labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts (the last slot is +Inf), then sum
+                histogram = self._histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            histogram[bisect_left(buckets, value)] += 1
+            histogram[-1] += value
+
+    @contextmanager
+    def phase(self, name):
+        """Time a pipeline phase and count the queries it issues"""
+        if not settings.METRICS_ENABLED:
+            yield
+            return
+        counter = QueryCounter()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                yield
+        except Exception:
+            self.inc('news_alert_phase_errors_total', phase=name)
+            raise
+        finally:
+            self.observe('news_alert_phase_duration_seconds', time.perf_counter() - start, phase=name)
+            self.inc('news_alert_phase_db_queries_total', counter.count, phase=name)
+            self.maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, list(labels), list(values)] for (name, labels), values in self._histograms.items()],
+            }
+
+    def maybe_flush(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        try:
+            cache = get_cache()
+            cache.set(PROCESS_KEY_PREFIX + self.process_id, self.snapshot(), timeout=settings.METRICS_PROCESS_TTL)
+            processes = cache.get(PROCESSES_KEY) or []
+            if self.process_id not in processes:
+                # Not atomic, but every flush re-adds a missing id, so a lost update heals itself
+                cache.set(PROCESSES_KEY, processes + [self.process_id], timeout=None)
+        except Exception as e:
+            logger.warning(f"Could not publish metrics: {e}")
+
+    def collect(self):
+        """Sum the snapshots of every live process into (counters, histograms) dicts"""
+        self.maybe_flush(force=True)
+        cache = get_cache()
+        processes = cache.get(PROCESSES_KEY) or []
+        snapshots = cache.get_many([PROCESS_KEY_PREFIX + p for p in processes])
+        live = [p for p in processes if PROCESS_KEY_PREFIX + p in snapshots]
+        if len(live) != len(processes):
+            cache.set(PROCESSES_KEY, live, timeout=None)
+
+        counters, histograms = {}, {}
+        for snapshot in snapshots.values():
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(tuple(label) for label in labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, values in snapshot['histograms']:
+                key = (name, tuple(tuple(label) for label in labels))
+                total = histograms.get(key)
+                histograms[key] = values if total is None else [a + b for a, b in zip(total, values)]
+        return counters, histograms
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        counters, histograms = self.collect()
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for (series, labels), value in sorted(counters.items()):
+                    if series == name:
+                        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                continue
+            for (series, labels), values in sorted(histograms.items()):
+                if series != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ['+Inf'], values[:-1]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bound)),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(values[-1])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+        stats = response_cache_stats()
+        for name, key in (('hits', 'hits'), ('misses', 'misses')):
+            lines.append(f'# HELP news_alert_response_cache_{name}_total Response cache {name}')
+            lines.append(f'# TYPE news_alert_response_cache_{name}_total counter')
+            lines.append(f'news_alert_response_cache_{name}_total {stats[key]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import QueryCounter, registry
+
+
+class RequestMetricsMiddleware:
+    """
+    Record duration, database queries and response size for every request.
+
+    Series are labelled with the URL pattern name rather than the path, so
+    /api/filters/1/ and /api/filters/2/ share one series. Place it first in
+    MIDDLEWARE so the time includes the rest of the stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match else 'unmatched'
+        registry.inc('news_alert_http_requests_total', view=view, method=request.method, status=response.status_code)
+        registry.observe('news_alert_http_request_duration_seconds', duration, view=view)
+        registry.observe('news_alert_http_request_db_queries', counter.count, view=view)
+        registry.observe('news_alert_http_request_db_duration_seconds', counter.duration, view=view)
+        if not response.streaming:
+            registry.observe('news_alert_http_response_size_bytes', len(response.content), view=view)
+        registry.maybe_flush()
+        return response
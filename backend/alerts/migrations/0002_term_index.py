@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:35
+
+import re
+
+from django.db import migrations, models
+
+# Frozen copies of alerts.matching's tokenizer as of this migration, so later
+# changes to the app code cannot change what migrating from scratch produces
+TOKEN_RE = re.compile(r'\w+')
+TERM_MAX_LENGTH = 100
+OVERFLOW_TERM = ''
+
+
+def searchable_text(item):
+    return f"{item.title} {item.description or ''} {item.content or ''}".lower()
+
+
+def tokenize(text):
+    terms = set()
+    for token in TOKEN_RE.findall(text):
+        terms.add(token if len(token) <= TERM_MAX_LENGTH else OVERFLOW_TERM)
+    return terms
+
+
+def backfill_term_index(apps, schema_editor):
+    NewsItem = apps.get_model('alerts', 'NewsItem')
+    IndexTerm = apps.get_model('alerts', 'IndexTerm')
+    Through = IndexTerm.news_items.through
+
+    batch = []
+    queryset = NewsItem.objects.only('id', 'title', 'description', 'content').order_by('id')
+    for item in queryset.iterator(chunk_size=1000):
+        batch.append((item.id, tokenize(searchable_text(item))))
+        if len(batch) >= 1000:
+            _index_batch(IndexTerm, Through, batch)
+            batch = []
+    if batch:
+        _index_batch(IndexTerm, Through, batch)
+
+
+def _index_batch(IndexTerm, Through, batch):
+    all_terms = set().union(*(terms for _, terms in batch))
+    IndexTerm.objects.bulk_create(
+        [IndexTerm(term=term) for term in all_terms], batch_size=1000, ignore_conflicts=True
+    )
+    term_ids = dict(IndexTerm.objects.filter(term__in=all_terms).values_list('term', 'id'))
+    Through.objects.bulk_create(
+        [Through(indexterm_id=term_ids[term], newsitem_id=item_id) for item_id, terms in batch for term in terms],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100, unique=True)),
+                ('news_items', models.ManyToManyField(related_name='index_terms', to='alerts.newsitem')),
+            ],
+        ),
+        migrations.RunPython(backfill_term_index, migrations.RunPython.noop),
+    ]
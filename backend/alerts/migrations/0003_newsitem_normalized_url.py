@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:38
+
+from urllib.parse import urlsplit, urlunsplit
+
+from django.db import migrations, models
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def normalize_url(url):
+    # Frozen copy of alerts.models.normalize_url as of this migration
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    host, _, port = netloc.rpartition(':')
+    if host and DEFAULT_PORTS.get(scheme) == port:
+        netloc = host
+    path = parts.path.rstrip('/')
+    return urlunsplit((scheme, netloc, path, parts.query, ''))[:1000]
+
+
+def populate_normalized_url(apps, schema_editor):
+    NewsItem = apps.get_model('alerts', 'NewsItem')
+    seen = set()
+    batch = []
+    for item in NewsItem.objects.only('id', 'url').order_by('id').iterator(chunk_size=1000):
+        key = normalize_url(item.url)
+        if key in seen:
+            # The oldest row (lowest id) keeps the key; later duplicates stay NULL
+            continue
+        seen.add(key)
+        item.normalized_url = key
+        batch.append(item)
+        if len(batch) >= 1000:
+            NewsItem.objects.bulk_update(batch, ['normalized_url'])
+            batch = []
+    if batch:
+        NewsItem.objects.bulk_update(batch, ['normalized_url'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0002_term_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsitem',
+            name='normalized_url',
+            field=models.CharField(blank=True, editable=False, max_length=1000, null=True, unique=True),
+        ),
+        migrations.RunPython(populate_normalized_url, migrations.RunPython.noop),
+    ]
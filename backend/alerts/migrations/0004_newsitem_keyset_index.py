@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0003_newsitem_normalized_url'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsitem',
+            index=models.Index(fields=['-published_at', '-id'], name='alerts_news_publish_cf2013_idx'),
+        ),
+    ]
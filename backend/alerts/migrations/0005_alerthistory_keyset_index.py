@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0004_newsitem_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alerthistory',
+            index=models.Index(fields=['-sent_at', '-id'], name='alerts_aler_sent_at_933244_idx'),
+        ),
+    ]
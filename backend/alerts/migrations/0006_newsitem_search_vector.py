@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:41
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS alerts_news_search_gin '
+        'ON alerts_newsitem USING gin (search_vector)'
+    )
+    schema_editor.execute(
+        "UPDATE alerts_newsitem SET search_vector = "
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS alerts_news_search_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0005_alerthistory_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsitem',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
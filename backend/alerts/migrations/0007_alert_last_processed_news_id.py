@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0006_newsitem_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='last_processed_news_id',
+            field=models.BigIntegerField(blank=True, help_text='Highest NewsItem id already matched for this alert', null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0008_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=200)),
+                ('url', models.URLField(max_length=1000, unique=True)),
+                ('category', models.CharField(blank=True, max_length=100, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=500)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=100)),
+                ('last_polled_at', models.DateTimeField(blank=True, null=True)),
+                ('last_status', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
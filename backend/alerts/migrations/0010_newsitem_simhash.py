@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0009_feedsource'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsitem',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earliest stored article of this near-duplicate cluster', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='alerts.newsitem'),
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='simhash_band_0',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='simhash_band_1',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='simhash_band_2',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='simhash_band_3',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0010_newsitem_simhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='filter',
+            name='matches_indexed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='FilterMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matched_at', models.DateTimeField(auto_now_add=True)),
+                ('filter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='alerts.filter')),
+                ('news_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='filter_matches', to='alerts.newsitem')),
+            ],
+            options={
+                'unique_together': {('filter', 'news_item')},
+            },
+        ),
+    ]
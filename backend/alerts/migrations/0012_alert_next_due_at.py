@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:51
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+# Frozen copy of Alert.FREQUENCY_INTERVALS as of this migration; immediate alerts are always due
+FREQUENCY_INTERVALS = {
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+}
+
+
+def populate_next_due_at(apps, schema_editor):
+    Alert = apps.get_model('alerts', 'Alert')
+    batch = []
+    for alert in Alert.objects.filter(last_sent__isnull=False).only('id', 'frequency', 'last_sent'):
+        interval = FREQUENCY_INTERVALS.get(alert.frequency)
+        alert.next_due_at = alert.last_sent + interval if interval else None
+        batch.append(alert)
+    Alert.objects.bulk_update(batch, ['next_due_at'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0011_filtermatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='next_due_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Earliest time the alert may send again; empty means due now', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['is_active', 'next_due_at'], name='alerts_aler_is_acti_af6736_idx'),
+        ),
+        migrations.RunPython(populate_next_due_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:55
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    # This migration used to create pg_trgm and a trigram index on
+    # UPPER(source). 0014 drops that index again, and creating the extension
+    # fails on databases whose role lacks the privilege, so it is no longer
+    # created here; 0014's DROP INDEX IF EXISTS still cleans up older databases.
+
+    dependencies = [
+        ('alerts', '0012_alert_next_due_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsitem',
+            index=models.Index(django.db.models.functions.text.Lower('category'), name='alerts_news_category_lower'),
+        ),
+    ]
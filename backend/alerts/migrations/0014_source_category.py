@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_dimensions(apps, schema_editor):
+    NewsItem = apps.get_model('alerts', 'NewsItem')
+    for model_name, field in (('Source', 'source'), ('Category', 'category')):
+        Dimension = apps.get_model('alerts', model_name)
+        names_by_key = {}
+        for name in NewsItem.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''}).order_by().values_list(field, flat=True).distinct():
+            names_by_key.setdefault(name.lower(), []).append(name)
+        Dimension.objects.bulk_create(
+            [Dimension(name=sorted(names)[0], key=key) for key, names in names_by_key.items()],
+            batch_size=1000,
+        )
+        for key, dimension_id in Dimension.objects.values_list('key', 'id'):
+            NewsItem.objects.filter(**{f'{field}__in': names_by_key[key]}).update(**{f'{field}_ref': dimension_id})
+
+
+def drop_source_trigram_index(apps, schema_editor):
+    # Source predicates now go through the Source table; older databases got this index from 0013
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS alerts_news_source_upper_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0013_newsitem_filter_predicate_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'categories',
+            },
+        ),
+        migrations.CreateModel(
+            name='Source',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('key', models.CharField(max_length=200, unique=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='newsitem',
+            name='alerts_news_category_lower',
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='category_ref',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='news_items', to='alerts.category'),
+        ),
+        migrations.AddField(
+            model_name='newsitem',
+            name='source_ref',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='news_items', to='alerts.source'),
+        ),
+        migrations.RunPython(populate_dimensions, migrations.RunPython.noop),
+        migrations.RunPython(drop_source_trigram_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:54
+
+import time
+
+from django.db import migrations, models
+
+
+def create_generation(apps, schema_editor):
+    # Start from the clock so a recreated database never reuses the
+    # generation of responses still held in a shared cache
+    DataGeneration = apps.get_model('alerts', 'DataGeneration')
+    DataGeneration.objects.get_or_create(pk=1, defaults={'value': int(time.time() * 1000)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0014_source_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(create_generation, migrations.RunPython.noop),
+    ]
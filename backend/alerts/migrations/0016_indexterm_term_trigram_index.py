@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:10
+
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def create_term_trigram_index(apps, schema_editor):
+    # IndexedFilterMatcher looks up terms with term__contains (LIKE '%token%'),
+    # which a trigram index can serve. pg_trgm needs privileges that managed
+    # databases may not grant; without it lookups still work, by sequential scan.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        installed = cursor.fetchone() is not None
+    if not installed:
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError as e:
+            logger.warning(f"Skipping the index term trigram index, pg_trgm is unavailable: {e}")
+            return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS alerts_indexterm_term_trgm '
+        'ON alerts_indexterm USING gin (term gin_trgm_ops)'
+    )
+
+
+def drop_term_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS alerts_indexterm_term_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0015_datageneration'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_term_trigram_index, drop_term_trigram_index),
+    ]
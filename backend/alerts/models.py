@@ -1,19 +1,83 @@
+from datetime import timedelta
+from urllib.parse import urlsplit, urlunsplit
+
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 from django.core.validators import EmailValidator
 
 
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def normalize_url(url):
+    """Normalize an article URL for duplicate detection"""
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    host, _, port = netloc.rpartition(':')
+    if host and DEFAULT_PORTS.get(scheme) == port:
+        netloc = host
+    path = parts.path.rstrip('/')
+    return urlunsplit((scheme, netloc, path, parts.query, ''))[:1000]
+
+
+
+class Source(models.Model):
+    """Canonical news source; key is the lowercased name"""
+    name = models.CharField(max_length=200)
+    key = models.CharField(max_length=200, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Category(models.Model):
+    """Canonical news category; key is the lowercased name"""
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        verbose_name_plural = 'categories'
+
+    def __str__(self):
+        return self.name
+
+
 class NewsItem(models.Model):
     """Model to store news items fetched from API"""
     title = models.CharField(max_length=500)
     description = models.TextField(blank=True, null=True)
     content = models.TextField(blank=True, null=True)
     url = models.URLField(max_length=1000)
+    normalized_url = models.CharField(max_length=1000, unique=True, null=True, blank=True, editable=False)
     source = models.CharField(max_length=200)
     author = models.CharField(max_length=200, blank=True, null=True)
     published_at = models.DateTimeField()
     image_url = models.URLField(max_length=1000, blank=True, null=True)
     category = models.CharField(max_length=100, blank=True, null=True)
+    # Integer references to the dimension tables, kept in step with source/category (see alerts.dimensions)
+    source_ref = models.ForeignKey(
+        Source, on_delete=models.PROTECT, blank=True, null=True, editable=False, related_name='news_items'
+    )
+    category_ref = models.ForeignKey(
+        Category, on_delete=models.PROTECT, blank=True, null=True, editable=False, related_name='news_items'
+    )
     keywords = models.JSONField(default=list, blank=True)
+    # SimHash of title + description, split into four 16-bit bands for LSH lookup (see alerts.fingerprint)
+    simhash = models.BigIntegerField(blank=True, null=True, editable=False)
+    simhash_band_0 = models.IntegerField(blank=True, null=True, db_index=True, editable=False)
+    simhash_band_1 = models.IntegerField(blank=True, null=True, db_index=True, editable=False)
+    simhash_band_2 = models.IntegerField(blank=True, null=True, db_index=True, editable=False)
+    simhash_band_3 = models.IntegerField(blank=True, null=True, db_index=True, editable=False)
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, blank=True, null=True, related_name='duplicates',
+        help_text="Earliest stored article of this near-duplicate cluster"
+    )
+    # Maintained by alerts.search; the GIN index is created by migration 0006 on PostgreSQL only
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -21,6 +85,7 @@ class NewsItem(models.Model):
         ordering = ['-published_at']
         indexes = [
             models.Index(fields=['-published_at']),
+            models.Index(fields=['-published_at', '-id']),
             models.Index(fields=['source']),
             models.Index(fields=['category']),
         ]
@@ -28,6 +93,49 @@ class NewsItem(models.Model):
     def __str__(self):
         return self.title[:100]
 
+    def save(self, *args, **kwargs):
+        from .dimensions import categories, sources
+        from .search import update_search_vectors
+
+        if self._state.adding and self.normalized_url is None:
+            self.normalized_url = normalize_url(self.url)
+        self.source_ref_id = sources.id_for(self.source)
+        self.category_ref_id = categories.id_for(self.category)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            extra = {'source': 'source_ref', 'category': 'category_ref'}
+            kwargs['update_fields'] = {*update_fields, *(extra[f] for f in update_fields if f in extra)}
+        super().save(*args, **kwargs)
+        # Bulk ingest fills search vectors itself; single saves (admin, shell) refresh this row
+        if update_fields is None or {'title', 'description'} & set(update_fields):
+            update_search_vectors([self.pk])
+
+
+class IndexTerm(models.Model):
+    """Inverted index term linking a lowercased token to the news items containing it"""
+    term = models.CharField(max_length=100, unique=True)
+    news_items = models.ManyToManyField(NewsItem, related_name='index_terms')
+
+    def __str__(self):
+        return self.term
+
+
+class FeedSource(models.Model):
+    """Model to store RSS/Atom feeds polled for news, with conditional GET state"""
+    name = models.CharField(max_length=200, blank=True)
+    url = models.URLField(max_length=1000, unique=True)
+    category = models.CharField(max_length=100, blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    etag = models.CharField(max_length=500, blank=True, default='')
+    last_modified = models.CharField(max_length=100, blank=True, default='')
+    last_polled_at = models.DateTimeField(blank=True, null=True)
+    last_status = models.IntegerField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name or self.url
+
 
 class Filter(models.Model):
     """Model to store filter criteria for news alerts"""
@@ -36,13 +144,30 @@ class Filter(models.Model):
     sources = models.JSONField(default=list, blank=True, help_text="List of source names")
     categories = models.JSONField(default=list, blank=True, help_text="List of categories")
     is_active = models.BooleanField(default=True)
+    # Set once FilterMatch holds every stored match for this filter; cleared when its criteria change
+    matches_indexed_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    CRITERIA_FIELDS = ('keywords', 'sources', 'categories')
+
     def __str__(self):
         return self.name
 
 
+class FilterMatch(models.Model):
+    """Materialized match between a filter and a news item"""
+    filter = models.ForeignKey(Filter, on_delete=models.CASCADE, related_name='matches')
+    news_item = models.ForeignKey(NewsItem, on_delete=models.CASCADE, related_name='filter_matches')
+    matched_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = [['filter', 'news_item']]
+
+    def __str__(self):
+        return f"{self.filter_id} - {self.news_item_id}"
+
+
 class Alert(models.Model):
     """Model to store alert configurations"""
     email = models.EmailField(validators=[EmailValidator()])
@@ -58,15 +183,54 @@ class Alert(models.Model):
     )
     is_active = models.BooleanField(default=True)
     last_sent = models.DateTimeField(blank=True, null=True)
+    last_processed_news_id = models.BigIntegerField(
+        blank=True, null=True,
+        help_text="Highest NewsItem id already matched for this alert"
+    )
+    next_due_at = models.DateTimeField(
+        blank=True, null=True, editable=False,
+        help_text="Earliest time the alert may send again; empty means due now"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    FREQUENCY_INTERVALS = {
+        'hourly': timedelta(hours=1),
+        'daily': timedelta(days=1),
+    }
+
     class Meta:
         unique_together = [['email', 'filter_criteria']]
+        indexes = [
+            models.Index(fields=['is_active', 'next_due_at']),
+        ]
 
     def __str__(self):
         return f"{self.email} - {self.filter_criteria.name}"
 
+    @classmethod
+    def compute_next_due_at(cls, frequency, last_sent):
+        """Return when an alert with this frequency last sent at last_sent is next due"""
+        interval = cls.FREQUENCY_INTERVALS.get(frequency)
+        if interval is None or last_sent is None:
+            return None
+        return last_sent + interval
+
+    @classmethod
+    def due(cls, now):
+        """Active alerts that may send at now, selected through the (is_active, next_due_at) index"""
+        return cls.objects.filter(
+            Q(next_due_at__isnull=True) | Q(next_due_at__lte=now),
+            is_active=True,
+        )
+
+    def save(self, *args, **kwargs):
+        self.next_due_at = self.compute_next_due_at(self.frequency, self.last_sent)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and ('frequency' in update_fields or 'last_sent' in update_fields):
+            kwargs['update_fields'] = {*update_fields, 'next_due_at'}
+        super().save(*args, **kwargs)
+
 
 class AlertHistory(models.Model):
     """Model to track sent alerts"""
@@ -84,7 +248,57 @@ class AlertHistory(models.Model):
 
     class Meta:
         ordering = ['-sent_at']
+        indexes = [
+            models.Index(fields=['-sent_at', '-id']),
+        ]
 
     def __str__(self):
         return f"{self.alert.email} - {self.sent_at}"
 
+
+
+class Job(models.Model):
+    """Model to track background pipeline jobs"""
+    kind = models.CharField(
+        max_length=50,
+        choices=[
+            ('fetch_news', 'Fetch News'),
+            ('process_alerts', 'Process Alerts'),
+        ]
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('pending', 'Pending'),
+            ('running', 'Running'),
+            ('succeeded', 'Succeeded'),
+            ('failed', 'Failed'),
+        ],
+        default='pending'
+    )
+    stage = models.CharField(max_length=50, blank=True, default='')
+    progress = models.JSONField(default=dict, blank=True, help_text="Per-stage progress details")
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
+
+
+class DataGeneration(models.Model):
+    """
+    Single-row counter bumped whenever news, filters or alerts change.
+
+    Kept in the database so that every process (web workers, Celery workers,
+    the scheduler, management commands) sees every bump; response cache keys
+    and ETags include it (see alerts.response_cache).
+    """
+    value = models.BigIntegerField()
+
+    def __str__(self):
+        return str(self.value)
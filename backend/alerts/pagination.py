@@ -0,0 +1,91 @@
+import json
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def get_page_size(request, default=None, maximum=None):
+    """Read page_size from the query string, clamped to [1, API_MAX_PAGE_SIZE]"""
+    default = default or settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    maximum = maximum or settings.API_MAX_PAGE_SIZE
+    try:
+        page_size = int(request.GET.get('page_size', default))
+    except (TypeError, ValueError):
+        page_size = default
+    return max(1, min(page_size, maximum))
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a descending (field, id) key. field may be a model
+    field or a numeric annotation such as a search rank.
+
+    The cursor encodes the key of the last row on a page, so fetching the next
+    page is an index range scan rather than an OFFSET that reads and discards
+    every earlier row.
+    """
+
+    def __init__(self, field, page_size):
+        self.field = field
+        self.page_size = page_size
+
+    def encode_cursor(self, item):
+        # Rows may be model instances or .values() dicts
+        if isinstance(item, dict):
+            value, pk = item[self.field], item['id']
+        else:
+            value, pk = getattr(item, self.field), item.pk
+        if hasattr(value, 'isoformat'):
+            # DjangoJSONEncoder truncates to milliseconds, which would skip rows
+            value = value.isoformat()
+        raw = json.dumps([value, pk], cls=DjangoJSONEncoder).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, queryset, cursor):
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            if self.field in queryset.query.annotations:
+                value = float(value)
+            else:
+                value = queryset.model._meta.get_field(self.field).to_python(value)
+            pk = int(pk)
+        except (binascii.Error, UnicodeError, ValueError, TypeError, ValidationError):
+            raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+        if value is None:
+            raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+        return value, pk
+
+    def order(self, queryset):
+        return queryset.order_by(f'-{self.field}', '-pk')
+
+    def paginate(self, queryset, cursor=None):
+        """Return (items, next_cursor) for the page after cursor"""
+        queryset = self.order(queryset)
+        if cursor:
+            value, pk = self.decode_cursor(queryset, cursor)
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__lt': value}) | Q(**{self.field: value, 'pk__lt': pk})
+            )
+        items = list(queryset[:self.page_size + 1])
+        next_cursor = None
+        if len(items) > self.page_size:
+            items = items[:self.page_size]
+            next_cursor = self.encode_cursor(items[-1])
+        return items, next_cursor
+
+
+def next_page_url(request, cursor):
+    """Build the absolute URL for the page identified by cursor"""
+    if not cursor:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
@@ -0,0 +1,144 @@
+import json
+import time
+import hashlib
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.http import HttpResponse
+
+from .models import DataGeneration
+
+logger = logging.getLogger(__name__)
+
+HITS_KEY = 'alerts:response_cache:hits'
+MISSES_KEY = 'alerts:response_cache:misses'
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _incr(key):
+    cache = get_cache()
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def get_data_generation():
+    """Return the current data generation, which every cached response key includes"""
+    generation = DataGeneration.objects.filter(pk=1).values_list('value', flat=True).first()
+    if generation is None:
+        # Start from the clock rather than 0 so a recreated database can never
+        # come back at a value that still has cached responses under it
+        generation = DataGeneration.objects.get_or_create(
+            pk=1, defaults={'value': int(time.time() * 1000)}
+        )[0].value
+    return generation
+
+
+def bump_data_generation():
+    """
+    Invalidate every cached response; call after news, filters or alerts change.
+
+    The counter lives in the database, so a bump inside a transaction becomes
+    visible to other processes together with the data it covers.
+    """
+    if not DataGeneration.objects.filter(pk=1).update(value=F('value') + 1):
+        get_data_generation()
+        DataGeneration.objects.filter(pk=1).update(value=F('value') + 1)
+
+
+def generation_etag(*parts):
+    """
+    Weak ETag for responses that only change with the data generation and
+    the given version parts (such as a max timestamp for rows written
+    without a bump). Computing it never loads the response's rows.
+    """
+    raw = ':'.join(str(part) for part in (get_data_generation(),) + parts)
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def response_cache_stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY) or 0
+    misses = cache.get(MISSES_KEY) or 0
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else 0.0,
+        "generation": get_data_generation(),
+    }
+
+
+def _normalized_body(request):
+    if not request.body:
+        return ''
+    try:
+        return json.dumps(json.loads(request.body.decode('utf-8')), sort_keys=True)
+    except (ValueError, UnicodeDecodeError):
+        return request.body.decode('utf-8', 'replace')
+
+
+def response_cache_key(request, view_name, kwargs, version=()):
+    """
+    Build a key from the view, its URL kwargs, the sorted query parameters,
+    the body, the version parts and the data generation. The scheme and host
+    are included too, since responses carry absolute pagination links.
+    """
+    params = sorted((key, values) for key, values in request.GET.lists())
+    raw = json.dumps(
+        [
+            view_name, request.scheme, request.get_host(), request.method, sorted(kwargs.items()),
+            params, _normalized_body(request), list(version),
+        ],
+        sort_keys=True, default=str,
+    )
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    return f'alerts:response:{get_data_generation()}:{digest}'
+
+
+def cached_response(methods=('GET',), version=None):
+    """
+    Cache a view's successful responses for the given methods.
+
+    Keys include the data generation, so bump_data_generation() invalidates
+    everything at once without TTL guessing. version is an optional
+    callable(request) returning extra key parts, the same ones the view's
+    ETag uses, for data that can change without a bump. RESPONSE_CACHE_TIMEOUT only bounds
+    how long a time-windowed result (such as "last 7 days") can lag behind the
+    clock. Streaming responses are never cached.
+    """
+    def decorator(view):
+        view_name = f'{view.__module__}.{view.__name__}'
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE_ENABLED or request.method not in methods:
+                return view(request, *args, **kwargs)
+
+            cache = get_cache()
+            key = response_cache_key(request, view_name, kwargs, version(request) if version else ())
+            cached = cache.get(key)
+            if cached is not None:
+                _incr(HITS_KEY)
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _incr(MISSES_KEY)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response['Content-Type']), timeout=settings.RESPONSE_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+    return decorator
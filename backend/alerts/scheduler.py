@@ -0,0 +1,120 @@
+import time
+import select
+import logging
+
+from django.db import connection
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import Alert, NewsItem
+
+logger = logging.getLogger(__name__)
+
+NEWS_CHANNEL = 'alerts_news_ingested'
+
+
+def notify_news_ingested():
+    """Wake schedulers waiting for new articles (PostgreSQL NOTIFY, delivered on commit)"""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, '')", [NEWS_CHANNEL])
+
+
+class AlertScheduler:
+    """
+    Run alert processing whenever something can be sent.
+
+    After each run the scheduler sleeps until the earliest future next_due_at,
+    or until new articles arrive for alerts that are already due (immediate
+    alerts, and periodic alerts that had nothing to send). On PostgreSQL new
+    articles are signalled with LISTEN/NOTIFY; other databases poll the
+    newest article id every poll_interval seconds. max_sleep bounds every
+    wait so that alert and filter edits are picked up.
+    """
+
+    def __init__(self, days=1, max_sleep=300, poll_interval=5):
+        self.days = days
+        self.max_sleep = max_sleep
+        self.poll_interval = poll_interval
+        # The raw connection LISTEN was issued on; a reconnect needs a new LISTEN
+        self._listening_on = None
+
+    def run_once(self):
+        from .engine import AlertProcessingEngine
+
+        engine = AlertProcessingEngine(days=self.days)
+        results = engine.run()
+        sent = sum(1 for r in results if r["status"] == "sent")
+        failed = sum(1 for r in results if r["status"] == "failed")
+        if sent or failed:
+            logger.info(f"Scheduler run: {sent} sent, {failed} failed")
+        return results
+
+    def seconds_until_next_due(self, now):
+        """Seconds until the earliest future next_due_at, capped at max_sleep"""
+        next_due = (
+            Alert.objects.filter(is_active=True, next_due_at__gt=now)
+            .aggregate(next_due=Min('next_due_at'))['next_due']
+        )
+        if next_due is None:
+            return self.max_sleep
+        return min(self.max_sleep, max(0.0, (next_due - now).total_seconds()))
+
+    def wait(self, timeout, high_water):
+        """Block until timeout or until an article newer than high_water exists; return True on new news"""
+        if connection.vendor == 'postgresql':
+            return self._wait_for_notify(timeout)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+            if (NewsItem.objects.aggregate(high_water=Max('id'))['high_water'] or 0) > high_water:
+                return True
+
+    def listen(self):
+        """Subscribe to new-article notifications on the current connection; safe to call repeatedly"""
+        if connection.vendor != 'postgresql':
+            return
+        connection.ensure_connection()
+        if connection.connection is self._listening_on:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {NEWS_CHANNEL}')
+        self._listening_on = connection.connection
+
+    def _wait_for_notify(self, timeout):
+        self.listen()
+        raw = connection.connection
+        deadline = time.monotonic() + timeout
+        while True:
+            raw.poll()
+            if raw.notifies:
+                raw.notifies.clear()
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            select.select([raw], [], [], remaining)
+
+    def run_forever(self):
+        while True:
+            try:
+                # Listen before each run so articles stored during it still wake
+                # us, including after Django has replaced a dropped connection
+                self.listen()
+                high_water = NewsItem.objects.aggregate(high_water=Max('id'))['high_water'] or 0
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error(f"Scheduler run failed: {e}")
+                timeout = self.seconds_until_next_due(timezone.now())
+                if timeout > 0:
+                    self.wait(timeout, high_water)
+            except Exception as e:
+                # Usually a lost database connection: drop it so the next pass reconnects
+                logger.error(f"Scheduler loop failed: {e}")
+                connection.close()
+                time.sleep(self.poll_interval)
@@ -0,0 +1,47 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+from .models import NewsItem
+
+SEARCH_CONFIG = 'english'
+
+NEWS_SEARCH_VECTOR = (
+    SearchVector('title', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+)
+
+
+def full_text_search_available():
+    """Full-text search needs PostgreSQL; other backends use the icontains fallback"""
+    return connection.vendor == 'postgresql'
+
+
+def update_search_vectors(news_item_ids):
+    """Recompute the stored tsvector for the given news items"""
+    if not full_text_search_available():
+        return 0
+    return NewsItem.objects.filter(id__in=news_item_ids).update(search_vector=NEWS_SEARCH_VECTOR)
+
+
+def search_news(queryset, text):
+    """
+    Filter a NewsItem queryset by free-text search.
+
+    On PostgreSQL this matches the GIN-indexed search_vector and annotates a
+    rank; elsewhere every word must appear in the title or description.
+    """
+    if full_text_search_available():
+        query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+        return (
+            queryset
+            .filter(search_vector=query)
+            # ts_rank returns real; as double precision the value survives the
+            # float/JSON round trip of a pagination cursor exactly
+            .annotate(rank=Cast(SearchRank(F('search_vector'), query), FloatField()))
+        )
+
+    for word in text.split():
+        queryset = queryset.filter(Q(title__icontains=word) | Q(description__icontains=word))
+    return queryset
@@ -0,0 +1,32 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder produces the same JSON
+    orjson = None
+
+_django_default = DjangoJSONEncoder().default
+
+
+def dumps(data):
+    """
+    Encode data to UTF-8 JSON bytes with DjangoJSONEncoder's value semantics.
+
+    Uses orjson when it is installed. Datetimes, dates, decimals and UUIDs are
+    passed through to DjangoJSONEncoder either way, so both encoders give the
+    same strings (millisecond datetimes, "Z" for UTC).
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_django_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class FastJsonResponse(HttpResponse):
+    """JsonResponse for plain dicts and lists (such as .values() rows), encoded by dumps()"""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
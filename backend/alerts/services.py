@@ -1,11 +1,24 @@
+import time
+import smtplib
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
-from .models import NewsItem, Filter, Alert, AlertHistory
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from .models import NewsItem, Filter, Alert, AlertHistory, normalize_url
+from .digests import DigestRenderer
+from .dimensions import categories, sources
+from .fingerprint import NearDuplicateClusterer, fingerprint_fields
+from .http import get_http_session, get_rate_limiter
+from .matching import FilterMatchIndex, TermIndex, article_records, searchable_text
+from .metrics import registry
+from .response_cache import bump_data_generation
+from .scheduler import notify_news_ingested
+from .search import update_search_vectors
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +26,20 @@ logger = logging.getLogger(__name__)
 class NewsAPIService:
     """Service to fetch news from NewsAPI"""
     
-    def __init__(self):
+    def __init__(self, session=None, rate_limiter=None):
         self.api_key = settings.NEWS_API_KEY
         self.base_url = settings.NEWS_API_URL
+        self.session = session or get_http_session()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+    
+    def _get_articles(self, url, params):
+        """GET a NewsAPI endpoint through the pooled session and return its articles"""
+        self.rate_limiter.wait(url)
+        response = self.session.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        
+        data = response.json()
+        return data.get('articles', [])
         
     def fetch_top_headlines(self, category=None, country='us', page_size=100):
         """Fetch top headlines from NewsAPI"""
@@ -34,11 +58,7 @@ class NewsAPIService:
             if category:
                 params['category'] = category
                 
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            return data.get('articles', [])
+            return self._get_articles(url, params)
             
         except requests.RequestException as e:
             logger.error(f"Error fetching news from API: {e}")
@@ -64,11 +84,7 @@ class NewsAPIService:
                 # Default query if none provided
                 params['q'] = 'news'
                 
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            return data.get('articles', [])
+            return self._get_articles(url, params)
             
         except requests.RequestException as e:
             logger.error(f"Error fetching news from API: {e}")
@@ -100,55 +116,173 @@ class NewsAPIService:
         ]
 
 
+class NewsFetchOrchestrator:
+    """Fetch several categories, queries and countries concurrently into one batch"""
+    
+    def __init__(self, concurrency=None, news_service=None):
+        self.concurrency = concurrency or settings.NEWS_FETCH_CONCURRENCY
+        self.news_service = news_service or NewsAPIService()
+    
+    def build_jobs(self, categories=None, queries=None, countries=None, page_size=100):
+        """Return a list of (method, kwargs) fetch jobs"""
+        jobs = []
+        for query in queries or []:
+            jobs.append((self.news_service.fetch_everything, {'query': query, 'page_size': page_size}))
+        if categories or not jobs:
+            for country in countries or ['us']:
+                for category in categories or [None]:
+                    jobs.append((
+                        self.news_service.fetch_top_headlines,
+                        {'category': category, 'country': country, 'page_size': page_size},
+                    ))
+        return jobs
+    
+    def fetch(self, categories=None, queries=None, countries=None, page_size=100):
+        """Run all fetch jobs concurrently and return the articles deduplicated by URL"""
+        jobs = self.build_jobs(categories, queries, countries, page_size)
+        with registry.phase('fetch'), ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(jobs)))) as executor:
+            futures = [executor.submit(method, **kwargs) for method, kwargs in jobs]
+            batches = []
+            for future in futures:
+                try:
+                    batches.append(future.result())
+                except Exception as e:
+                    logger.error(f"Fetch job failed: {e}")
+        
+        articles = []
+        seen = set()
+        for batch in batches:
+            for article in batch:
+                key = normalize_url(article.get('url'))
+                if key in seen:
+                    continue
+                seen.add(key)
+                articles.append(article)
+        logger.info(f"Fetched {len(articles)} unique articles from {len(jobs)} requests")
+        registry.inc('news_alert_articles_fetched_total', len(articles))
+        return articles
+    
+    def store(self, articles):
+        """Feed a fetched batch into storage"""
+        return NewsStorageService.bulk_store_news_items(articles)
+    
+    def fetch_and_store(self, categories=None, queries=None, countries=None, page_size=100):
+        """Fetch concurrently and feed the combined batch into storage"""
+        return self.store(self.fetch(categories, queries, countries, page_size))
+
+
 class NewsFilterService:
     """Service to filter news items based on criteria"""
     
+    @staticmethod
+    def compile(filter_criteria, queryset=None):
+        """
+        Return a NewsItem queryset with the filter's source and category
+        predicates evaluated by the database.
+        
+        Criteria are resolved against the small Source and Category tables, so
+        the predicates are integer set membership on the foreign keys. The result
+        is a superset of what filter_news keeps, and filter_news still checks
+        every surviving row.
+        """
+        queryset = NewsItem.objects.all() if queryset is None else queryset
+        if filter_criteria.sources:
+            queryset = queryset.filter(source_ref__in=sources.query_containing(filter_criteria.sources))
+        if filter_criteria.categories:
+            queryset = queryset.filter(category_ref__in=categories.query_matching(filter_criteria.categories))
+        return queryset
+    
     @staticmethod
     def filter_news(news_items, filter_criteria):
-        """Filter news items based on filter criteria"""
+        """
+        Filter news items based on filter criteria.
+        
+        news_items may be NewsItem instances, ArticleRecords or a QuerySet. A
+        QuerySet is scanned as records and only the matches are loaded as
+        NewsItem instances.
+        """
         if not filter_criteria:
             return news_items
         
+        if isinstance(news_items, QuerySet):
+            # Only rows passing the source and category predicates leave the database
+            queryset = NewsFilterService.compile(filter_criteria, news_items)
+            matched = NewsFilterService.filter_news(article_records(queryset), filter_criteria)
+            by_id = queryset.in_bulk([record.id for record in matched])
+            return [by_id[record.id] for record in matched if record.id in by_id]
+        
+        keywords = [keyword.lower() for keyword in filter_criteria.keywords or []]
         filtered_items = []
         
         for item in news_items:
             matches = True
             
             # Filter by keywords
-            if filter_criteria.keywords:
-                text_content = f"{item.title} {item.description or ''} {item.content or ''}".lower()
+            if keywords:
+                text_content = searchable_text(item)
                 keyword_match = any(
-                    keyword.lower() in text_content 
-                    for keyword in filter_criteria.keywords
+                    keyword in text_content 
+                    for keyword in keywords
                 )
                 if not keyword_match:
                     matches = False
             
             # Filter by sources
-            if filter_criteria.sources and matches:
-                source_match = any(
-                    source.lower() in item.source.lower()
-                    for source in filter_criteria.sources
-                )
-                if not source_match:
-                    matches = False
+            if matches and not NewsFilterService.source_matches(item, filter_criteria):
+                matches = False
             
             # Filter by categories
-            if filter_criteria.categories and matches:
-                if item.category:
-                    category_match = any(
-                        cat.lower() == item.category.lower()
-                        for cat in filter_criteria.categories
-                    )
-                    if not category_match:
-                        matches = False
-                else:
-                    matches = False
+            if matches and not NewsFilterService.category_matches(item, filter_criteria):
+                matches = False
             
             if matches:
                 filtered_items.append(item)
         
         return filtered_items
+    
+    @staticmethod
+    def source_matches(item, filter_criteria):
+        """Check an item against the filter's sources (case-insensitive substring)"""
+        if not filter_criteria.sources:
+            return True
+        if item.source_ref_id is None or not sources.is_known(item.source_ref_id):
+            # Unsaved or unresolved items fall back to comparing names
+            return any(
+                source.lower() in item.source.lower()
+                for source in filter_criteria.sources
+            )
+        return item.source_ref_id in sources.containing(filter_criteria.sources)
+    
+    @staticmethod
+    def category_matches(item, filter_criteria):
+        """Check an item against the filter's categories (case-insensitive equality)"""
+        if not filter_criteria.categories:
+            return True
+        if not item.category:
+            return False
+        if item.category_ref_id is None or not categories.is_known(item.category_ref_id):
+            return any(
+                cat.lower() == item.category.lower()
+                for cat in filter_criteria.categories
+            )
+        return item.category_ref_id in categories.matching(filter_criteria.categories)
+
+
+# Arbitrary application-wide key for pg_advisory_xact_lock
+NEWS_INGEST_LOCK_ID = 0x6e657773
+
+
+def lock_news_ingest():
+    """
+    Serialize news ingest until the current transaction ends.
+
+    PostgreSQL takes a transaction-scoped advisory lock, which only other
+    ingests wait for. SQLite already serializes writing transactions.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [NEWS_INGEST_LOCK_ID])
 
 
 class NewsStorageService:
@@ -157,58 +291,194 @@ class NewsStorageService:
     @staticmethod
     def store_news_items(articles):
         """Store news articles in the database"""
-        stored_items = []
+        stored_items, _ = NewsStorageService.bulk_store_news_items(articles)
+        return stored_items
+    
+    @staticmethod
+    @registry.phase('store')
+    def bulk_store_news_items(articles, batch_size=500):
+        """
+        Store news articles with one lookup and one bulk insert per batch.
         
-        for article in articles:
-            # Parse published date
-            published_at_str = article.get('publishedAt')
-            if published_at_str:
-                try:
-                    # Handle different datetime formats
-                    if 'T' in published_at_str:
-                        published_at = datetime.fromisoformat(
-                            published_at_str.replace('Z', '+00:00')
-                        )
-                    else:
-                        published_at = datetime.strptime(
-                            published_at_str, '%Y-%m-%d %H:%M:%S'
-                        )
-                except (ValueError, AttributeError):
-                    published_at = datetime.now()
-            else:
-                published_at = datetime.now()
-            
-            # Extract source name
-            source = article.get('source', {})
-            source_name = source.get('name', 'Unknown') if isinstance(source, dict) else str(source)
-            
-            # Check if news item already exists
-            existing_item = NewsItem.objects.filter(url=article.get('url')).first()
-            
-            if existing_item:
-                stored_items.append(existing_item)
-                continue
-            
-            # Create news item
-            news_item = NewsItem.objects.create(
-                title=article.get('title', '')[:500],
-                description=article.get('description', '')[:2000],
-                content=article.get('content', '')[:10000],
-                url=article.get('url', ''),
-                source=source_name[:200],
-                author=article.get('author', '')[:200] if article.get('author') else None,
-                published_at=published_at,
-                image_url=article.get('urlToImage', '')[:1000] if article.get('urlToImage') else None,
-            )
-            
-            stored_items.append(news_item)
+        Returns the stored item for every article, in input order, and a dict
+        with the number of inserted and skipped articles.
         
-        return stored_items
+        The insert commits together with its indexing (terms, search vectors,
+        clusters, filter matches), and concurrent calls are serialized, so the
+        engine's high-water mark never passes an uncommitted or unindexed id.
+        """
+        keys = [normalize_url(article.get('url')) for article in articles]
+        unique_keys = set(keys)
+        
+        try:
+            with transaction.atomic():
+                # Held until commit: concurrent ingests queue here, so ids are
+                # allocated and committed in the same order
+                lock_news_ingest()
+                
+                existing = {}
+                key_list = list(unique_keys)
+                for start in range(0, len(key_list), batch_size):
+                    chunk = key_list[start:start + batch_size]
+                    existing.update(
+                        (item.normalized_url, item)
+                        for item in NewsItem.objects.filter(normalized_url__in=chunk)
+                    )
+                
+                pending = {}
+                for key, article in zip(keys, articles):
+                    if key not in existing and key not in pending:
+                        pending[key] = NewsStorageService._build_news_item(article, key)
+                
+                if pending:
+                    NewsStorageService._assign_dimensions(pending.values())
+                    NewsItem.objects.bulk_create(
+                        pending.values(), batch_size=batch_size, ignore_conflicts=True
+                    )
+                    # ignore_conflicts does not return primary keys, so reload the new rows
+                    pending_keys = list(pending)
+                    new_items = []
+                    for start in range(0, len(pending_keys), batch_size):
+                        chunk = pending_keys[start:start + batch_size]
+                        new_items.extend(NewsItem.objects.filter(normalized_url__in=chunk))
+                    for item in new_items:
+                        existing[item.normalized_url] = item
+                
+                    # Keep the keyword index, full-text vectors, near-duplicate clusters and filter matches in step
+                    TermIndex.index_items(new_items)
+                    update_search_vectors([item.id for item in new_items])
+                    NearDuplicateClusterer.link(new_items)
+                    FilterMatchIndex.index_items(new_items)
+                    # After commit, so filter and alert writes never wait on an ingest for the generation row
+                    transaction.on_commit(bump_data_generation)
+                    notify_news_ingested()
+        except Exception:
+            # Source and Category rows created in the rolled-back transaction are gone
+            sources.clear()
+            categories.clear()
+            raise
+        
+        stored_items = [existing[key] for key in keys if key in existing]
+        stats = {
+            'inserted': len(pending),
+            'skipped': len(articles) - len(pending),
+        }
+        logger.info(
+            f"Stored {len(articles)} articles: {stats['inserted']} inserted, {stats['skipped']} skipped"
+        )
+        registry.inc('news_alert_articles_stored_total', stats['inserted'], result='inserted')
+        registry.inc('news_alert_articles_stored_total', stats['skipped'], result='skipped')
+        return stored_items, stats
+    
+    @staticmethod
+    def _assign_dimensions(news_items):
+        """Set source_ref and category_ref, creating missing Source and Category rows in one query each"""
+        source_ids = sources.ids_for(item.source for item in news_items)
+        category_ids = categories.ids_for(item.category for item in news_items)
+        for item in news_items:
+            item.source_ref_id = source_ids.get(item.source)
+            item.category_ref_id = category_ids.get(item.category)
+    
+    @staticmethod
+    def _parse_published_at(article):
+        """Parse the article's publishedAt value, falling back to now"""
+        published_at_str = article.get('publishedAt')
+        if not published_at_str:
+            return datetime.now()
+        try:
+            # Handle different datetime formats
+            if 'T' in published_at_str:
+                return datetime.fromisoformat(published_at_str.replace('Z', '+00:00'))
+            return datetime.strptime(published_at_str, '%Y-%m-%d %H:%M:%S')
+        except (ValueError, AttributeError):
+            return datetime.now()
+    
+    @staticmethod
+    def _build_news_item(article, normalized_url):
+        """Build an unsaved NewsItem from a NewsAPI-style article dict"""
+        # Extract source name
+        source = article.get('source', {})
+        source_name = source.get('name', 'Unknown') if isinstance(source, dict) else str(source)
+        
+        title = (article.get('title') or '')[:500]
+        description = (article.get('description') or '')[:2000]
+        
+        return NewsItem(
+            title=title,
+            description=description,
+            content=(article.get('content') or '')[:10000],
+            url=article.get('url') or '',
+            normalized_url=normalized_url,
+            source=(source_name or 'Unknown')[:200],
+            author=article.get('author', '')[:200] if article.get('author') else None,
+            published_at=NewsStorageService._parse_published_at(article),
+            image_url=article.get('urlToImage', '')[:1000] if article.get('urlToImage') else None,
+            category=article.get('category')[:100] if article.get('category') else None,
+            **fingerprint_fields(title, description),
+        )
 
 
 class EmailAlertService:
     """Service to send email alerts"""
     
+    @staticmethod
+    def build_message(alert, news_items, connection=None, renderer=None):
+        """
+        Build the email message for an alert and its news items.
+
+        Pass a shared DigestRenderer when building many messages so that
+        identical digests are rendered once; only the recipient differs.
+        """
+        digest = (renderer or DigestRenderer()).render(alert.filter_criteria, news_items)
+        message = EmailMultiAlternatives(
+            subject=digest.subject,
+            body=digest.text,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[alert.email],
+            connection=connection,
+        )
+        message.attach_alternative(digest.html, 'text/html')
+        return message
+    
+    @staticmethod
+    def build_consolidated_message(deliveries, connection=None, renderer=None):
+        """
+        Build one message for several alerts to the same address.
+
+        Each alert's filter becomes a section; an article (or a near-duplicate
+        of one) that appears under several filters is shown only in the first.
+        """
+        seen = set()
+        sections = []
+        for alert, news_items in sorted(deliveries, key=lambda d: d[0].filter_criteria.name.lower()):
+            unique = []
+            for item in news_items:
+                key = item.duplicate_of_id or item.id
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(item)
+            if unique:
+                sections.append((alert.filter_criteria, unique))
+
+        digest = (renderer or DigestRenderer()).render_consolidated(sections)
+        message = EmailMultiAlternatives(
+            subject=digest.subject,
+            body=digest.text,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[deliveries[0][0].email],
+            connection=connection,
+        )
+        message.attach_alternative(digest.html, 'text/html')
+        return message
+    
+    @staticmethod
+    def group_by_recipient(deliveries):
+        """Group (alert, news_items) pairs by case-insensitive email address, in first-seen order"""
+        groups = {}
+        for alert, news_items in deliveries:
+            groups.setdefault(alert.email.lower(), []).append((alert, news_items))
+        return list(groups.values())
+    
     @staticmethod
     def send_alert(alert, news_items):
         """Send email alert with filtered news items"""
@@ -216,74 +486,140 @@ class EmailAlertService:
             logger.info(f"No news items to send for alert {alert.id}")
             return False
         
+        return EmailAlertService.send_batch([(alert, news_items)])[alert.id]
+    
+    @staticmethod
+    @registry.phase('send')
+    def send_batch(deliveries, batch_size=None, max_retries=None, consolidate=None):
+        """
+        Send many alerts over one reused SMTP connection per chunk.
+        
+        deliveries is a list of (alert, news_items) pairs. Each distinct digest
+        is rendered once and shared by every alert that receives it. With
+        consolidate (default EMAIL_CONSOLIDATE_DIGESTS) all alerts for one
+        address are merged into a single message. Transient SMTP errors
+        are retried on a fresh connection with exponential backoff. last_sent,
+        history rows and their news item links are written in bulk afterwards,
+        per alert. Returns a dict mapping alert id to True (sent) or False (failed).
+        """
+        batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+        max_retries = settings.EMAIL_MAX_RETRIES if max_retries is None else max_retries
+        consolidate = settings.EMAIL_CONSOLIDATE_DIGESTS if consolidate is None else consolidate
+        
+        if consolidate:
+            groups = EmailAlertService.group_by_recipient(deliveries)
+        else:
+            groups = [[delivery] for delivery in deliveries]
+        
+        outcomes = {}
+        renderer = DigestRenderer()
+        for start in range(0, len(groups), batch_size):
+            chunk = groups[start:start + batch_size]
+            connection = get_connection(fail_silently=False)
+            try:
+                for group in chunk:
+                    sent = EmailAlertService._send_with_retry(connection, group, max_retries, renderer)
+                    for alert, _ in group:
+                        outcomes[alert.id] = sent
+            finally:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+        
+        logger.info(
+            f"Rendered {renderer.renders} digests for {len(deliveries)} alerts in {len(groups)} messages "
+            f"({renderer.reuses} reused)"
+        )
+        sent = sum(1 for ok in outcomes.values() if ok)
+        registry.inc('news_alert_emails_total', sent, status='sent')
+        registry.inc('news_alert_emails_total', len(outcomes) - sent, status='failed')
+        EmailAlertService._record_deliveries(deliveries, outcomes)
+        return outcomes
+    
+    @staticmethod
+    def _send_with_retry(connection, deliveries, max_retries, renderer=None):
+        """Send one message for the given deliveries on the open connection, reconnecting on transient errors"""
+        alert = deliveries[0][0]
+        label = f"alert {alert.id}" if len(deliveries) == 1 else f"alerts {', '.join(str(a.id) for a, _ in deliveries)}"
         try:
-            # Prepare email content
-            subject = f"News Alert: {alert.filter_criteria.name}"
-            
-            # Create HTML email
-            html_message = f"""
-            <html>
-            <body>
-                <h2>News Alert: {alert.filter_criteria.name}</h2>
-                <p>You have {len(news_items)} new article(s) matching your criteria.</p>
-                <hr>
-            """
-            
-            for item in news_items[:10]:  # Limit to 10 items in email
-                html_message += f"""
-                <div style="margin-bottom: 20px; padding: 10px; border: 1px solid #ddd;">
-                    <h3><a href="{item.url}" target="_blank">{item.title}</a></h3>
-                    <p><strong>Source:</strong> {item.source}</p>
-                    <p><strong>Published:</strong> {item.published_at.strftime('%Y-%m-%d %H:%M')}</p>
-                    {f'<p>{item.description[:200]}...</p>' if item.description else ''}
-                </div>
-                """
-            
-            html_message += """
-                <hr>
-                <p><small>This is an automated news alert. To manage your alerts, please visit the news alert system.</small></p>
-            </body>
-            </html>
-            """
-            
-            plain_message = strip_tags(html_message)
-            
-            # Send email
-            send_mail(
-                subject=subject,
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[alert.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            
-            # Update alert last_sent
-            alert.last_sent = datetime.now()
-            alert.save()
-            
-            # Create alert history
-            alert_history = AlertHistory.objects.create(
-                alert=alert,
-                email_status='sent'
-            )
-            alert_history.news_items.set(news_items)
-            
-            logger.info(f"Successfully sent alert {alert.id} to {alert.email}")
-            return True
-            
+            if len(deliveries) == 1:
+                message = EmailAlertService.build_message(
+                    alert, deliveries[0][1], connection=connection, renderer=renderer
+                )
+            else:
+                message = EmailAlertService.build_consolidated_message(
+                    deliveries, connection=connection, renderer=renderer
+                )
         except Exception as e:
-            logger.error(f"Error sending alert {alert.id}: {e}")
-            
-            # Create alert history with failed status
+            logger.error(f"Error building {label}: {e}")
+            return False
+        
+        for attempt in range(max_retries + 1):
             try:
-                alert_history = AlertHistory.objects.create(
-                    alert=alert,
-                    email_status='failed'
-                )
-                alert_history.news_items.set(news_items)
-            except Exception:
-                pass
-            
+                # open() is a no-op on a live connection and reconnects after a failure
+                connection.open()
+                connection.send_messages([message])
+                logger.info(f"Successfully sent {label} to {alert.email}")
+                return True
+            except Exception as e:
+                if not EmailAlertService._is_transient(e):
+                    logger.error(f"Error sending {label}: {e}")
+                    return False
+                if attempt >= max_retries:
+                    logger.error(f"Error sending {label} after {attempt + 1} attempts: {e}")
+                    return False
+                logger.warning(f"Transient error sending {label}, retrying: {e}")
+                time.sleep(settings.EMAIL_RETRY_BACKOFF * (2 ** attempt))
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+        return False
+    
+    @staticmethod
+    def _is_transient(error):
+        """SMTP 4xx replies, dropped connections and socket errors are worth retrying"""
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        if isinstance(error, smtplib.SMTPServerDisconnected):
+            return True
+        if isinstance(error, smtplib.SMTPException):
             return False
+        return isinstance(error, OSError)
+    
+    @staticmethod
+    def _record_deliveries(deliveries, outcomes):
+        """
+        Write last_sent, next_due_at, history rows and news item links in bulk.
 
+        The messages have already gone out, so a failure here is logged rather
+        than raised: raising would stop the engine from advancing the alerts'
+        high-water marks and the same articles would be sent again.
+        """
+        sent_alerts = [alert for alert, _ in deliveries if outcomes.get(alert.id)]
+        now = timezone.now()
+        for alert in sent_alerts:
+            alert.last_sent = now
+            alert.next_due_at = Alert.compute_next_due_at(alert.frequency, now)
+        
+        try:
+            with transaction.atomic():
+                if sent_alerts:
+                    Alert.objects.bulk_update(sent_alerts, ['last_sent', 'next_due_at'], batch_size=500)
+                histories = AlertHistory.objects.bulk_create([
+                    AlertHistory(alert=alert, email_status='sent' if outcomes.get(alert.id) else 'failed')
+                    for alert, _ in deliveries
+                ])
+                Through = AlertHistory.news_items.through
+                Through.objects.bulk_create(
+                    [
+                        Through(alerthistory_id=history.id, newsitem_id=item.id)
+                        for history, (_, news_items) in zip(histories, deliveries)
+                        for item in news_items
+                    ],
+                    batch_size=1000,
+                    ignore_conflicts=True,
+                )
+        except Exception as e:
+            logger.error(f"Error recording deliveries: {e}")
@@ -0,0 +1,127 @@
+import logging
+from contextlib import contextmanager
+
+from celery import chain, shared_task
+from django.db import transaction
+
+from .engine import AlertProcessingEngine
+from .matching import FilterMatchIndex
+from .models import Filter, Job
+from .response_cache import bump_data_generation
+from .services import NewsFetchOrchestrator, NewsStorageService
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def job_stage(job_id, stage):
+    """Mark a job as running the given stage, and as failed if the stage raises"""
+    Job.objects.filter(id=job_id).update(status='running', stage=stage)
+    try:
+        yield
+    except Exception as e:
+        logger.error(f"Job {job_id} failed during {stage}: {e}")
+        Job.objects.filter(id=job_id).update(status='failed', error=str(e))
+        raise
+
+
+def record_progress(job_id, stage, **details):
+    """Store progress details for a stage"""
+    job = Job.objects.get(id=job_id)
+    job.progress[stage] = details
+    job.save(update_fields=['progress', 'updated_at'])
+
+
+def finish_job(job_id, result):
+    Job.objects.filter(id=job_id).update(status='succeeded', stage='', result=result)
+
+
+@shared_task
+def fetch_articles(job_id, categories=None, queries=None, countries=None, page_size=100):
+    """Fetch stage: pull articles from NewsAPI"""
+    with job_stage(job_id, 'fetch'):
+        articles = NewsFetchOrchestrator().fetch(
+            categories=categories, queries=queries, countries=countries, page_size=page_size
+        )
+        record_progress(job_id, 'fetch', articles=len(articles))
+        return articles
+
+
+@shared_task
+def store_articles(articles, job_id, finish=True):
+    """Store stage: bulk insert fetched articles"""
+    with job_stage(job_id, 'store'):
+        stored_items, stats = NewsStorageService.bulk_store_news_items(articles)
+        result = {"count": len(stored_items), **stats}
+        record_progress(job_id, 'store', **result)
+        if finish:
+            finish_job(job_id, {**result, "news_item_ids": [item.id for item in stored_items]})
+        return result
+
+
+@shared_task
+def match_alerts(job_id, days=1):
+    """Match stage: select due alerts and match them against the news window"""
+    with job_stage(job_id, 'match'):
+        plan = AlertProcessingEngine(days=days).plan()
+        record_progress(
+            job_id, 'match',
+            deliveries=len(plan["deliveries"]),
+            without_email=len(plan["results"]),
+        )
+        return plan
+
+
+@shared_task
+def send_alerts(plan, job_id):
+    """Send stage: deliver the emails in a match plan"""
+    with job_stage(job_id, 'send'):
+        engine = AlertProcessingEngine()
+        results = engine.deliver(plan)
+        sent = sum(1 for r in results if r["status"] == "sent")
+        record_progress(job_id, 'send', sent=sent, failed=sum(1 for r in results if r["status"] == "failed"))
+        finish_job(job_id, {"processed": len(results), "results": results, "timings": engine.timings})
+        return sent
+
+
+def start_fetch_job(categories=None, queries=None, countries=None, page_size=100, process_alerts=False, days=1):
+    """Create a job and queue fetch -> store, optionally followed by match -> send"""
+    job = Job.objects.create(kind='fetch_news')
+    stages = [
+        fetch_articles.s(job.id, categories=categories, queries=queries, countries=countries, page_size=page_size),
+        store_articles.s(job.id, finish=not process_alerts),
+    ]
+    if process_alerts:
+        stages += [match_alerts.si(job.id, days=days), send_alerts.s(job.id)]
+    workflow = chain(*stages)
+    transaction.on_commit(workflow.apply_async)
+    return job
+
+
+def start_process_alerts_job(days=1):
+    """Create a job and queue match -> send"""
+    job = Job.objects.create(kind='process_alerts')
+    workflow = chain(match_alerts.si(job.id, days=days), send_alerts.s(job.id))
+    transaction.on_commit(workflow.apply_async)
+    return job
+
+
+@shared_task
+def backfill_filter_matches(filter_id):
+    """Rebuild the materialized matches of one filter"""
+    filter_criteria = Filter.objects.filter(id=filter_id).first()
+    if filter_criteria is None:
+        return 0
+    matched = FilterMatchIndex.backfill_filter(filter_criteria)
+    if matched is None:
+        return None
+    bump_data_generation()
+    logger.info(f"Backfilled {matched} matches for filter {filter_id}")
+    return matched
+
+
+def queue_filter_backfill(filter_criteria):
+    """Mark a filter's matches stale and queue their backfill once the transaction commits"""
+    Filter.objects.filter(id=filter_criteria.id).update(matches_indexed_at=None)
+    filter_criteria.matches_indexed_at = None
+    transaction.on_commit(lambda: backfill_filter_matches.delay(filter_criteria.id))
@@ -0,0 +1,493 @@
+import smtplib
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .corpus import CorpusGenerator
+from .dimensions import categories, sources
+from .engine import AlertProcessingEngine
+from .feeds import FeedSourceService
+from .http import HostRateLimiter
+from .matching import FilterAutomaton, FilterMatchIndex, IndexedFilterMatcher, article_records
+from .models import Alert, AlertHistory, DataGeneration, FeedSource, Filter, FilterMatch, NewsItem, Source
+from .response_cache import get_cache
+from .scheduler import AlertScheduler
+from .services import NewsFilterService, NewsStorageService
+
+
+class AlertsTestCase(TestCase):
+    """Clears the in-process dimension caches, whose ids would otherwise outlive rolled-back test data"""
+
+    @classmethod
+    def setUpClass(cls):
+        sources.clear()
+        categories.clear()
+        super().setUpClass()
+
+    def tearDown(self):
+        sources.clear()
+        categories.clear()
+        super().tearDown()
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class AlertHistoryQueryCountTests(AlertsTestCase):
+    """The history endpoint must issue the same number of queries however many rows a page holds"""
+
+    # ETag aggregate and data generation, the history page (with its alert and
+    # filter joined) and the news item prefetch
+    EXPECTED_QUERIES = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.filter = Filter.objects.create(name='Markets', keywords=['market'])
+        cls.alerts = [
+            Alert.objects.create(email=f'user{i}@example.com', filter_criteria=cls.filter, frequency='daily')
+            for i in range(3)
+        ]
+        cls.news_items = [
+            NewsItem.objects.create(
+                title=f'Market story {i}',
+                url=f'https://example.com/story/{i}',
+                source='Example Wire',
+                published_at=now,
+            )
+            for i in range(5)
+        ]
+
+    def create_history(self, count):
+        for i in range(count):
+            history = AlertHistory.objects.create(alert=self.alerts[i % len(self.alerts)], email_status='sent')
+            history.news_items.set(self.news_items[:1 + i % len(self.news_items)])
+
+    def assert_history_queries(self, rows, params=''):
+        self.create_history(rows)
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get(f'/api/alert-history/?page_size=50{params}')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), rows)
+        return results
+
+    def test_embedded_articles_with_few_rows(self):
+        results = self.assert_history_queries(2)
+        self.assertEqual(results[0]['news_items'][0]['title'][:12], 'Market story')
+
+    def test_embedded_articles_with_many_rows(self):
+        self.assert_history_queries(20)
+
+    def test_article_ids_with_few_rows(self):
+        results = self.assert_history_queries(2, '&news_items=ids')
+        self.assertTrue(all(isinstance(item, int) for item in results[0]['news_items']))
+
+    def test_article_ids_with_many_rows(self):
+        self.assert_history_queries(20, '&news_items=ids')
+
+
+FEED_XML = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Local Feed</title>
+<item><title>First story</title><link>https://feed.example/1</link><description>One</description>
+<pubDate>Sat, 17 Oct 2026 10:00:00 GMT</pubDate></item>
+<item><title>Second story</title><link>https://feed.example/2</link><description>Two</description>
+<pubDate>Sat, 17 Oct 2026 11:00:00 GMT</pubDate></item>
+</channel></rss>"""
+FEED_ETAG = '"feed-v1"'
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Serve FEED_XML with an ETag and answer a matching If-None-Match with 304"""
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == FEED_ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('ETag', FEED_ETAG)
+        self.end_headers()
+        self.wfile.write(FEED_XML)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FeedPollingTests(AlertsTestCase):
+    """Conditional GET against a local HTTP server"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), FeedHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.feed = FeedSource.objects.create(url=f'http://127.0.0.1:{self.server.server_port}/feed.xml')
+
+    @staticmethod
+    def poll():
+        return FeedSourceService(rate_limiter=HostRateLimiter(0)).poll()
+
+    def test_second_poll_is_not_modified(self):
+        first = self.poll()
+        self.assertEqual((first['modified'], first['inserted']), (1, 2))
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.etag, FEED_ETAG)
+
+        second = self.poll()
+        self.assertEqual((second['not_modified'], second['articles']), (1, 0))
+        self.assertEqual(NewsItem.objects.filter(url__startswith='https://feed.example/').count(), 2)
+
+    def test_validators_are_not_saved_when_storage_fails(self):
+        with mock.patch.object(NewsStorageService, 'bulk_store_news_items', side_effect=RuntimeError('database down')):
+            with self.assertRaises(RuntimeError):
+                self.poll()
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.etag, '')
+
+        # The entries are fetched again rather than lost behind a 304
+        summary = self.poll()
+        self.assertEqual((summary['modified'], summary['inserted']), (1, 2))
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], RESPONSE_CACHE_ENABLED=False)
+class CollapseDuplicatesTests(AlertsTestCase):
+    """?collapse=1 keeps one matching article per near-duplicate cluster"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.root = NewsItem.objects.create(
+            title='Storm hits coast', url='https://example.com/storm', source='Daily Post', published_at=now,
+        )
+        cls.duplicate = NewsItem.objects.create(
+            title='Storm hits the coast', url='https://example.org/storm', source='Metro Wire',
+            published_at=now, duplicate_of=cls.root,
+        )
+        cls.other = NewsItem.objects.create(
+            title='Markets rally', url='https://example.com/markets', source='Daily Post', published_at=now,
+        )
+
+    def ids(self, params):
+        response = self.client.get(f'/api/news/?collapse=1&{params}')
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.json()['results']}
+
+    def test_root_represents_its_cluster(self):
+        self.assertEqual(self.ids(''), {self.root.id, self.other.id})
+
+    def test_duplicate_represents_cluster_when_root_is_filtered_out(self):
+        self.assertEqual(self.ids('source=metro'), {self.duplicate.id})
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ResponseCacheGenerationTests(AlertsTestCase):
+    """Cached responses are keyed by the generation stored in the database, not by per-process state"""
+
+    def setUp(self):
+        get_cache().clear()
+        NewsItem.objects.create(
+            title='Storm hits coast', url='https://example.com/storm', source='Daily Post', published_at=timezone.now(),
+        )
+
+    def get_news(self):
+        response = self.client.get('/api/news/')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_bump_from_another_process_invalidates_cached_responses(self):
+        self.assertEqual(self.get_news()['X-Cache'], 'MISS')
+        self.assertEqual(self.get_news()['X-Cache'], 'HIT')
+
+        # What a Celery worker's bump looks like from here: only the row changes
+        DataGeneration.objects.filter(pk=1).update(value=F('value') + 1)
+        self.assertEqual(self.get_news()['X-Cache'], 'MISS')
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'api.example.com'])
+    def test_pagination_links_follow_the_requested_host(self):
+        NewsItem.objects.create(
+            title='Markets rally', url='https://example.com/markets', source='Daily Post', published_at=timezone.now(),
+        )
+        first = self.client.get('/api/news/?page_size=1')
+        self.assertTrue(first.json()['next'].startswith('http://testserver/'))
+
+        other = self.client.get('/api/news/?page_size=1', HTTP_HOST='api.example.com', secure=True)
+        self.assertEqual(other['X-Cache'], 'MISS')
+        self.assertTrue(other.json()['next'].startswith('https://api.example.com/'))
+
+    def test_news_stored_without_a_bump_changes_the_etag(self):
+        first = self.get_news()
+        NewsItem.objects.create(
+            title='Markets rally', url='https://example.com/markets', source='Daily Post', published_at=timezone.now(),
+        )
+        # Sending the old ETag must not produce a 304, nor a stale cached body
+        second = self.client.get('/api/news/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual((second['X-Cache'], second.json()['count']), ('MISS', 2))
+
+
+class NewsStorageTests(AlertsTestCase):
+    """Stored articles commit together with their filter matches"""
+
+    ARTICLES = [
+        {'title': 'Market rally continues', 'url': 'https://example.com/rally', 'source': {'name': 'New Wire'},
+         'publishedAt': '2026-10-17T10:00:00Z'},
+    ]
+
+    def setUp(self):
+        self.filter = Filter.objects.create(name='Markets', keywords=['market'], matches_indexed_at=timezone.now())
+
+    def test_indexing_failure_rolls_back_the_insert(self):
+        with mock.patch.object(FilterMatchIndex, 'index_items', side_effect=RuntimeError('database down')):
+            with self.assertRaises(RuntimeError):
+                NewsStorageService.bulk_store_news_items(self.ARTICLES)
+        # Otherwise the article would be visible to the engine without its FilterMatch row
+        self.assertFalse(NewsItem.objects.exists())
+        self.assertFalse(Source.objects.exists())
+
+        _, stats = NewsStorageService.bulk_store_news_items(self.ARTICLES)
+        self.assertEqual(stats['inserted'], 1)
+        self.assertTrue(FilterMatch.objects.filter(filter=self.filter, news_item__url='https://example.com/rally').exists())
+
+
+class CorpusFilterTests(AlertsTestCase):
+    """Synthetic filters created after news get the matches of the stored news"""
+
+    def test_filters_created_after_news_are_backfilled(self):
+        generator = CorpusGenerator(seed=1, entities=20)
+        generator.generate_news(200)
+        generator.generate_filters(10)
+
+        news_items = list(NewsItem.objects.all())
+        for f in Filter.objects.all():
+            self.assertIsNotNone(f.matches_indexed_at)
+            expected = {item.id for item in NewsFilterService.filter_news(news_items, f)}
+            self.assertEqual(set(FilterMatch.objects.filter(filter=f).values_list('news_item_id', flat=True)), expected)
+
+
+class FilterBackfillTests(AlertsTestCase):
+    """A backfill only marks its filter indexed if the criteria it scanned are still current"""
+
+    def setUp(self):
+        # Stored through ingest so the term index knows them
+        self.market, self.storm = NewsStorageService.store_news_items([
+            {'title': 'Market rally', 'url': 'https://example.com/market', 'source': {'name': 'Daily Post'}},
+            {'title': 'Storm hits coast', 'url': 'https://example.com/storm', 'source': {'name': 'Daily Post'}},
+        ])
+        self.filter = Filter.objects.create(name='Markets', keywords=['market'])
+
+    def matched_ids(self):
+        return set(FilterMatch.objects.filter(filter=self.filter).values_list('news_item_id', flat=True))
+
+    def test_backfill_marks_the_filter_indexed(self):
+        self.assertEqual(FilterMatchIndex.backfill_filter(self.filter), 1)
+        self.filter.refresh_from_db()
+        self.assertIsNotNone(self.filter.matches_indexed_at)
+        self.assertEqual(self.matched_ids(), {self.market.id})
+
+    def test_edit_during_the_scan_discards_the_backfill(self):
+        def edit_filter(filter_criteria):
+            # A PUT lands while the old criteria are being scanned
+            Filter.objects.filter(id=self.filter.id).update(keywords=['storm'])
+            return None
+
+        with mock.patch.object(IndexedFilterMatcher, 'candidate_ids', side_effect=edit_filter):
+            self.assertIsNone(FilterMatchIndex.backfill_filter(self.filter))
+        self.filter.refresh_from_db()
+        self.assertIsNone(self.filter.matches_indexed_at)
+        self.assertEqual(self.matched_ids(), set())
+
+
+class SchedulerTests(AlertsTestCase):
+    """The long-running scheduler survives database errors outside the run itself"""
+
+    def test_error_while_waiting_does_not_stop_the_loop(self):
+        scheduler = AlertScheduler()
+        with mock.patch.object(scheduler, 'run_once') as run_once, \
+                mock.patch.object(scheduler, 'seconds_until_next_due', side_effect=[DatabaseError('gone'), KeyboardInterrupt]), \
+                mock.patch.object(connection, 'close') as close, \
+                mock.patch('alerts.scheduler.time.sleep'):
+            with self.assertRaises(KeyboardInterrupt):
+                scheduler.run_forever()
+        self.assertEqual(run_once.call_count, 2)
+        close.assert_called_once()
+
+
+def legacy_filter_news(news_items, filter_criteria):
+    """The original substring loop every matcher must agree with"""
+    matched = []
+    for item in news_items:
+        text = f"{item.title} {item.description or ''} {item.content or ''}".lower()
+        if filter_criteria.keywords and not any(k.lower() in text for k in filter_criteria.keywords):
+            continue
+        if filter_criteria.sources and not any(s.lower() in item.source.lower() for s in filter_criteria.sources):
+            continue
+        if filter_criteria.categories and not (
+            item.category and any(c.lower() == item.category.lower() for c in filter_criteria.categories)
+        ):
+            continue
+        matched.append(item)
+    return matched
+
+
+class MatcherAgreementTests(AlertsTestCase):
+    """Every matcher returns exactly what the original substring loop returns"""
+
+    ARTICLES = [
+        ('Apple unveils new iPhone', 'The U.S. launch is in New York.', 'Reuters', 'Technology'),
+        ('APPLE shares fall', 'Investors in new-york react', 'Bloomberg News', 'business'),
+        ('Pineapple harvest', 'Farmers in Zürich celebrate', 'The Local', None),
+        ('Central bank holds rates', 'U.S.-China trade talks continue', 'Reuters World', 'Business'),
+        ('Storm warning', 'Residents of New  York told to stay home!', 'AP', 'Weather'),
+        ('Match report', 'C++ developers win the cup', 'Sports Desk', 'sports'),
+    ]
+    FILTERS = [
+        {'keywords': ['apple']},
+        {'keywords': ['Apple'], 'sources': ['reuters']},
+        {'keywords': ['new york']},
+        {'keywords': ['New York', 'zürich'], 'categories': ['BUSINESS', 'technology']},
+        {'keywords': ['u.s.']},
+        {'keywords': ['c++']},
+        {'keywords': ['!!!']},
+        {'keywords': ['']},
+        {'keywords': ['holds rates'], 'sources': ['Bloomberg']},
+        {'keywords': [], 'sources': ['reut', 'local']},
+        {'keywords': [], 'categories': ['Sports']},
+        {'keywords': ['storm'], 'sources': ['Nowhere Times']},
+        {'keywords': ['trade'], 'categories': ['Weather']},
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.filters = [
+            Filter.objects.create(name=f'Filter {i}', **criteria) for i, criteria in enumerate(cls.FILTERS)
+        ]
+        # Stored through ingest, which fills the term index and records FilterMatch rows
+        NewsStorageService.store_news_items([
+            {
+                'title': title, 'description': description, 'url': f'https://example.com/{i}',
+                'source': {'name': source}, 'category': category, 'publishedAt': '2026-10-17T10:00:00Z',
+            }
+            for i, (title, description, source, category) in enumerate(cls.ARTICLES)
+        ])
+
+    @staticmethod
+    def ids(items):
+        return {item.id for item in items}
+
+    def test_all_matchers_agree_with_the_original_loop(self):
+        items = list(NewsItem.objects.all())
+        records = list(article_records(NewsItem.objects.all()))
+        automaton = FilterAutomaton(self.filters)
+        by_items, by_records = automaton.match(items), automaton.match(records)
+        matcher = IndexedFilterMatcher()
+
+        for f in self.filters:
+            expected = self.ids(legacy_filter_news(items, f))
+            with self.subTest(filter=f.name, keywords=f.keywords, sources=f.sources, categories=f.categories):
+                self.assertEqual(self.ids(NewsFilterService.filter_news(items, f)), expected)
+                self.assertEqual(self.ids(NewsFilterService.filter_news(records, f)), expected)
+                self.assertEqual(self.ids(NewsFilterService.filter_news(NewsItem.objects.all(), f)), expected)
+                compiled = NewsFilterService.compile(f)
+                self.assertEqual(self.ids(NewsFilterService.filter_news(list(compiled), f)), expected)
+                self.assertEqual(self.ids(matcher.filter_news(NewsItem.objects.all(), f)), expected)
+                self.assertEqual(self.ids(by_items[f.id]), expected)
+                self.assertEqual(self.ids(by_records[f.id]), expected)
+                self.assertEqual(set(f.matches.values_list('news_item_id', flat=True)), expected)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_MAX_RETRIES=0)
+class AlertEngineTests(AlertsTestCase):
+    """Engine runs against the locmem mail backend"""
+
+    def setUp(self):
+        # Indexed before any news, so ingest records every match
+        self.filter = Filter.objects.create(name='Markets', keywords=['market'], matches_indexed_at=timezone.now())
+        self.alerts = [
+            Alert.objects.create(email=f'user{i}@example.com', filter_criteria=self.filter, frequency='immediate')
+            for i in range(2)
+        ]
+        self.serial = 0
+
+    def store(self, *titles):
+        articles = []
+        for title in titles:
+            self.serial += 1
+            articles.append({
+                'title': title, 'url': f'https://example.com/{self.serial}', 'source': {'name': 'Daily Post'},
+                'publishedAt': timezone.now().isoformat(),
+            })
+        return NewsStorageService.store_news_items(articles)
+
+    @staticmethod
+    def run_engine():
+        return {result['alert_id']: result for result in AlertProcessingEngine(days=1).run()}
+
+    def cursors(self):
+        return set(Alert.objects.values_list('last_processed_news_id', flat=True))
+
+    def test_sends_new_articles_once(self):
+        rally, slump, _ = self.store('Market rally', 'Market slump', 'Storm hits coast')
+        results = self.run_engine()
+        self.assertEqual({r['status'] for r in results.values()}, {'sent'})
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['user0@example.com', 'user1@example.com'])
+        self.assertEqual(self.cursors(), {NewsItem.objects.latest('id').id})
+        for alert in self.alerts:
+            history = AlertHistory.objects.get(alert=alert)
+            self.assertEqual(history.email_status, 'sent')
+            self.assertEqual(set(history.news_items.values_list('id', flat=True)), {rally.id, slump.id})
+
+        # Nothing new: nothing is sent
+        results = self.run_engine()
+        self.assertEqual({r['status'] for r in results.values()}, {'no_news'})
+        self.assertEqual(len(mail.outbox), 2)
+
+        # A new article is sent; a copy of one already delivered is not
+        copy, crash = self.store('Market rally, updated', 'Market crash')
+        NewsItem.objects.filter(id=copy.id).update(duplicate_of=rally)
+        results = self.run_engine()
+        self.assertEqual({r['status'] for r in results.values()}, {'sent'})
+        latest = AlertHistory.objects.filter(alert=self.alerts[0]).latest('id')
+        self.assertEqual(list(latest.news_items.values_list('id', flat=True)), [crash.id])
+
+    def test_failed_send_keeps_the_cursor(self):
+        rally, = self.store('Market rally')
+        refused = smtplib.SMTPRecipientsRefused({'user0@example.com': (550, b'No such user')})
+        with mock.patch.object(EmailBackend, 'send_messages', side_effect=refused):
+            results = self.run_engine()
+        self.assertEqual({r['status'] for r in results.values()}, {'failed'})
+        self.assertEqual(self.cursors(), {None})
+        self.assertEqual(set(AlertHistory.objects.values_list('email_status', flat=True)), {'failed'})
+
+        # The same article is retried on the next run
+        results = self.run_engine()
+        self.assertEqual({r['status'] for r in results.values()}, {'sent'})
+        self.assertEqual(self.cursors(), {rally.id})
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_recording_failure_still_advances_the_cursor(self):
+        rally, = self.store('Market rally')
+        with mock.patch.object(Alert.objects, 'bulk_update', side_effect=DatabaseError('deadlock')):
+            results = self.run_engine()
+        self.assertEqual({r['status'] for r in results.values()}, {'sent'})
+        self.assertEqual(self.cursors(), {rally.id})
+
+        # The delivered article is not sent again
+        results = self.run_engine()
+        self.assertEqual({r['status'] for r in results.values()}, {'no_news'})
+        self.assertEqual(len(mail.outbox), 2)
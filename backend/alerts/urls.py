@@ -13,5 +13,8 @@ urlpatterns = [
     path("alerts/<int:alert_id>/test/", views.alert_test, name="alert-test"),
     path("alerts/process_all/", views.alerts_process_all, name="alerts-process-all"),
     path("alert-history/", views.alert_history_list, name="alert-history"),
+    path("jobs/<int:job_id>/", views.job_detail, name="job-detail"),
+    path("cache/stats/", views.cache_stats, name="cache-stats"),
+    path("metrics/", views.metrics, name="metrics"),
 ]
 
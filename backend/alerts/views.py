@@ -1,13 +1,26 @@
 import json
 from datetime import timedelta
 
-from django.http import JsonResponse, HttpResponseNotAllowed
+from django.db.models import Max, Prefetch
+from django.http import HttpResponse, JsonResponse, HttpResponseNotAllowed, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
 
-from .models import Alert, AlertHistory, Filter, NewsItem
-from .services import EmailAlertService, NewsAPIService, NewsFilterService, NewsStorageService
+from .dimensions import categories, sources
+from .models import Alert, AlertHistory, Filter, Job, NewsItem
+from .fingerprint import collapse_clusters
+from .matching import FilterMatchIndex, filter_version, invalidate_filter_automaton
+from .metrics import registry
+from .response_cache import bump_data_generation, cached_response, generation_etag, response_cache_stats
+from .pagination import InvalidCursor, KeysetPaginator, get_page_size, next_page_url
+from .search import search_news
+from .serialization import FastJsonResponse, dumps
+from .services import EmailAlertService, NewsFilterService
+from .tasks import queue_filter_backfill, start_fetch_job, start_process_alerts_job
 
 
 # ---------------------------------------------------------------------------
@@ -23,7 +36,29 @@ def _parse_json(request):
     return {}
 
 
-def news_item_to_dict(item: NewsItem):
+NEWS_ITEM_FIELDS = (
+    "id", "title", "description", "content", "url", "source", "author",
+    "published_at", "image_url", "category", "keywords", "created_at",
+)
+NEWS_ITEM_SUMMARY_FIELDS = tuple(f for f in NEWS_ITEM_FIELDS if f != "content")
+FILTER_FIELDS = ("id", "name", "keywords", "sources", "categories", "is_active", "created_at", "updated_at")
+ALERT_FIELDS = ("id", "email", "frequency", "is_active", "last_sent", "created_at", "updated_at")
+
+
+def _requested_news_fields(request):
+    """Resolve the optional ?fields= sparse field set; "summary" drops content"""
+    fields = request.GET.get("fields")
+    if not fields:
+        return None
+    if fields == "summary":
+        return NEWS_ITEM_SUMMARY_FIELDS
+    requested = {f.strip() for f in fields.split(",")}
+    return tuple(f for f in NEWS_ITEM_FIELDS if f in requested or f == "id")
+
+
+def news_item_to_dict(item: NewsItem, fields=None):
+    if fields is not None:
+        return {name: getattr(item, name) for name in fields}
     return {
         "id": item.id,
         "title": item.title,
@@ -66,11 +101,94 @@ def alert_to_dict(a: Alert):
     }
 
 
-def alert_history_to_dict(h: AlertHistory):
+def alert_rows(qs):
+    """Alert dicts in alert_to_dict's shape, built from .values() rows without model instances"""
+    columns = ALERT_FIELDS + tuple(f"filter_criteria__{name}" for name in FILTER_FIELDS)
+    rows = []
+    for row in qs.values(*columns):
+        criteria = {name: row.pop(f"filter_criteria__{name}") for name in FILTER_FIELDS}
+        rows.append({
+            "id": row["id"],
+            "email": row["email"],
+            "filter_criteria": criteria if criteria["id"] is not None else None,
+            "frequency": row["frequency"],
+            "is_active": row["is_active"],
+            "last_sent": row["last_sent"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        })
+    return rows
+
+
+def job_to_dict(j: Job):
+    return {
+        "id": j.id,
+        "kind": j.kind,
+        "status": j.status,
+        "stage": j.stage,
+        "progress": j.progress,
+        "result": j.result,
+        "error": j.error,
+        "created_at": j.created_at,
+        "updated_at": j.updated_at,
+    }
+
+
+# ETags for conditional GETs: If-None-Match is answered with 304 before the
+# view runs. Every write path bumps the data generation (kept in the
+# database, so bumps from workers count too); news and filters also include
+# cheap aggregates of their own table, so rows written by any process without
+# a bump still change the ETag and the response cache key. Deliveries do not
+# bump, so alerts and history include their cheapest change marker instead.
+
+def _request_version(compute):
+    """Memoize a view's version parts per request; its ETag and cache key both read them"""
+    def version(request):
+        versions = request.__dict__.setdefault("_data_versions", {})
+        if compute not in versions:
+            versions[compute] = compute()
+        return versions[compute]
+    return version
+
+
+# The newest id comes from the primary key index; a row count would scan the table
+_news_version = _request_version(lambda: (NewsItem.objects.aggregate(last_id=Max("id"))["last_id"],))
+_filters_version = _request_version(filter_version)
+
+
+def _news_etag(request, *args, **kwargs):
+    return generation_etag(*_news_version(request))
+
+
+def _filters_etag(request, *args, **kwargs):
+    return generation_etag(*_filters_version(request))
+
+
+def _alerts_etag(request, *args, **kwargs):
+    return generation_etag(Alert.objects.aggregate(last_sent=Max("last_sent"))["last_sent"])
+
+
+def _alert_history_etag(request, *args, **kwargs):
+    return generation_etag(AlertHistory.objects.aggregate(last_id=Max("id"))["last_id"])
+
+
+def _job_accepted(request, job):
+    job.refresh_from_db()
+    payload = job_to_dict(job)
+    payload["job_id"] = job.id
+    payload["status_url"] = request.build_absolute_uri(reverse("job-detail", args=[job.id]))
+    return JsonResponse(payload, status=202)
+
+
+def alert_history_to_dict(h: AlertHistory, news_item_ids_only=False):
+    if news_item_ids_only:
+        news_items = [n.id for n in h.news_items.all()]
+    else:
+        news_items = [news_item_to_dict(n) for n in h.news_items.all()]
     return {
         "id": h.id,
         "alert": alert_to_dict(h.alert),
-        "news_items": [news_item_to_dict(n) for n in h.news_items.all()],
+        "news_items": news_items,
         "sent_at": h.sent_at,
         "email_status": h.email_status,
     }
@@ -81,27 +199,68 @@ def alert_history_to_dict(h: AlertHistory):
 # ---------------------------------------------------------------------------
 
 @csrf_exempt
+@cache_control(no_cache=True)
+@condition(etag_func=_news_etag)
+@cached_response(version=_news_version)
 def news_list(request):
     if request.method != "GET":
         return HttpResponseNotAllowed(["GET"])
 
     qs = NewsItem.objects.all()
 
+    # Source and category go through the dimension tables: integer set membership on the foreign keys
     source = request.GET.get("source")
     if source:
-        qs = qs.filter(source__icontains=source)
+        qs = qs.filter(source_ref__in=sources.query_containing([source]))
 
     category = request.GET.get("category")
     if category:
-        qs = qs.filter(category=category)
+        qs = qs.filter(category_ref__in=categories.query_matching([category]))
 
     keywords = request.GET.get("keywords")
     if keywords:
         for kw in [k.strip() for k in keywords.split(",") if k.strip()]:
             qs = qs.filter(title__icontains=kw) | qs.filter(description__icontains=kw)
 
-    items = [news_item_to_dict(n) for n in qs.order_by("-published_at")]
-    return JsonResponse({"count": len(items), "results": items}, safe=False)
+    # ?search= uses the full-text index and orders by rank where available
+    order_field = "published_at"
+    search = request.GET.get("search", "").strip()
+    if search:
+        qs = search_news(qs, search)
+        if "rank" in qs.query.annotations:
+            order_field = "rank"
+
+    # ?collapse=1 returns one matching article per near-duplicate cluster
+    if request.GET.get("collapse") in ("1", "true"):
+        qs = collapse_clusters(qs)
+
+    fields = _requested_news_fields(request) or NEWS_ITEM_FIELDS
+
+    paginator = KeysetPaginator(order_field, get_page_size(request))
+
+    if request.GET.get("format") == "ndjson":
+        return _stream_ndjson(paginator.order(qs), fields)
+
+    # Rows come back as dicts of the requested columns; the cursor needs the order field too
+    columns = fields if order_field in fields else fields + (order_field,)
+    try:
+        results, next_cursor = paginator.paginate(qs.values(*columns), request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if columns is not fields:
+        for row in results:
+            del row[order_field]
+    return FastJsonResponse({"count": len(results), "next": next_page_url(request, next_cursor), "results": results})
+
+
+def _stream_ndjson(qs, fields):
+    """Stream a queryset as newline-delimited JSON without materializing it"""
+    def rows():
+        for row in qs.values(*fields).iterator(chunk_size=2000):
+            yield dumps(row) + b"\n"
+
+    return StreamingHttpResponse(rows(), content_type="application/x-ndjson")
 
 
 @csrf_exempt
@@ -114,15 +273,19 @@ def news_fetch(request):
     query = data.get("query")
     page_size = data.get("page_size", 100)
 
-    news_service = NewsAPIService()
-    if query:
-        articles = news_service.fetch_everything(query=query, page_size=page_size)
-    else:
-        articles = news_service.fetch_top_headlines(category=category, page_size=page_size)
-
-    stored_items = NewsStorageService.store_news_items(articles)
-    items = [news_item_to_dict(n) for n in stored_items]
-    return JsonResponse({"count": len(items), "results": items})
+    categories = data.get("categories") or ([category] if category else None)
+    queries = data.get("queries") or ([query] if query else None)
+    countries = data.get("countries")
+
+    job = start_fetch_job(
+        categories=categories,
+        queries=queries,
+        countries=countries,
+        page_size=page_size,
+        process_alerts=data.get("process_alerts", False),
+        days=data.get("days", 1),
+    )
+    return _job_accepted(request, job)
 
 
 # ---------------------------------------------------------------------------
@@ -130,10 +293,13 @@ def news_fetch(request):
 # ---------------------------------------------------------------------------
 
 @csrf_exempt
+@cache_control(no_cache=True)
+@condition(etag_func=_filters_etag)
+@cached_response(version=_filters_version)
 def filters_list(request):
     if request.method == "GET":
-        filters = [filter_to_dict(f) for f in Filter.objects.all().order_by("-created_at")]
-        return JsonResponse({"count": len(filters), "results": filters})
+        filters = list(Filter.objects.order_by("-created_at").values(*FILTER_FIELDS))
+        return FastJsonResponse({"count": len(filters), "results": filters})
 
     if request.method == "POST":
         data = _parse_json(request)
@@ -144,6 +310,9 @@ def filters_list(request):
             categories=data.get("categories", []),
             is_active=data.get("is_active", True),
         )
+        invalidate_filter_automaton()
+        queue_filter_backfill(f)
+        bump_data_generation()
         return JsonResponse(filter_to_dict(f), status=201)
 
     return HttpResponseNotAllowed(["GET", "POST"])
@@ -158,22 +327,30 @@ def filter_detail(request, filter_id):
 
     if request.method == "PUT":
         data = _parse_json(request)
+        criteria = [getattr(f, field) for field in Filter.CRITERIA_FIELDS]
         f.name = data.get("name", f.name)
         f.keywords = data.get("keywords", f.keywords)
         f.sources = data.get("sources", f.sources)
         f.categories = data.get("categories", f.categories)
         f.is_active = data.get("is_active", f.is_active)
         f.save()
+        invalidate_filter_automaton()
+        if criteria != [getattr(f, field) for field in Filter.CRITERIA_FIELDS]:
+            queue_filter_backfill(f)
+        bump_data_generation()
         return JsonResponse(filter_to_dict(f))
 
     if request.method == "DELETE":
         f.delete()
+        invalidate_filter_automaton()
+        bump_data_generation()
         return JsonResponse({"deleted": True})
 
     return HttpResponseNotAllowed(["GET", "PUT", "DELETE"])
 
 
 @csrf_exempt
+@cached_response(methods=("POST",), version=lambda request: _news_version(request) + _filters_version(request))
 def filter_apply(request, filter_id):
     if request.method != "POST":
         return HttpResponseNotAllowed(["POST"])
@@ -184,9 +361,13 @@ def filter_apply(request, filter_id):
     since = timezone.now() - timedelta(days=days)
     news_items = NewsItem.objects.filter(published_at__gte=since)
 
-    filtered = NewsFilterService.filter_news(news_items, f)
-    items = [news_item_to_dict(n) for n in filtered]
-    return JsonResponse({"filter": filter_to_dict(f), "count": len(items), "results": items})
+    matched = FilterMatchIndex.matched_news(f, news_items)
+    if matched is not None:
+        items = list(matched.values(*NEWS_ITEM_FIELDS))
+    else:
+        # Matches are still being backfilled; scan the window instead
+        items = [news_item_to_dict(n) for n in NewsFilterService.filter_news(news_items, f)]
+    return FastJsonResponse({"filter": filter_to_dict(f), "count": len(items), "results": items})
 
 
 # ---------------------------------------------------------------------------
@@ -194,10 +375,12 @@ def filter_apply(request, filter_id):
 # ---------------------------------------------------------------------------
 
 @csrf_exempt
+@cache_control(no_cache=True)
+@condition(etag_func=_alerts_etag)
 def alerts_list(request):
     if request.method == "GET":
-        alerts = [alert_to_dict(a) for a in Alert.objects.all().order_by("-created_at")]
-        return JsonResponse({"count": len(alerts), "results": alerts})
+        alerts = alert_rows(Alert.objects.order_by("-created_at"))
+        return FastJsonResponse({"count": len(alerts), "results": alerts})
 
     if request.method == "POST":
         data = _parse_json(request)
@@ -209,6 +392,7 @@ def alerts_list(request):
             frequency=data.get("frequency", "daily"),
             is_active=data.get("is_active", True),
         )
+        bump_data_generation()
         return JsonResponse(alert_to_dict(a), status=201)
 
     return HttpResponseNotAllowed(["GET", "POST"])
@@ -229,10 +413,12 @@ def alert_detail(request, alert_id):
         a.frequency = data.get("frequency", a.frequency)
         a.is_active = data.get("is_active", a.is_active)
         a.save()
+        bump_data_generation()
         return JsonResponse(alert_to_dict(a))
 
     if request.method == "DELETE":
         a.delete()
+        bump_data_generation()
         return JsonResponse({"deleted": True})
 
     return HttpResponseNotAllowed(["GET", "PUT", "DELETE"])
@@ -247,9 +433,13 @@ def alert_test(request, alert_id):
     data = _parse_json(request)
     days = data.get("days", 7)
     since = timezone.now() - timedelta(days=days)
-    news_items = list(NewsItem.objects.filter(published_at__gte=since))
+    news_items = NewsItem.objects.filter(published_at__gte=since)
 
-    filtered_items = NewsFilterService.filter_news(news_items, alert.filter_criteria)
+    matched = FilterMatchIndex.matched_news(alert.filter_criteria, news_items)
+    if matched is not None:
+        filtered_items = list(matched)
+    else:
+        filtered_items = NewsFilterService.filter_news(news_items, alert.filter_criteria)
     if not filtered_items:
         return JsonResponse({"message": "No news items match the filter criteria", "count": 0})
 
@@ -270,40 +460,8 @@ def alerts_process_all(request):
         return HttpResponseNotAllowed(["POST"])
 
     data = _parse_json(request)
-    days = data.get("days", 1)
-    since = timezone.now() - timedelta(days=days)
-
-    results = []
-    for alert in Alert.objects.filter(is_active=True):
-        should_send = False
-        if alert.frequency == "immediate":
-            should_send = True
-        elif alert.frequency == "hourly":
-            should_send = (not alert.last_sent) or (timezone.now() - alert.last_sent) >= timedelta(hours=1)
-        elif alert.frequency == "daily":
-            should_send = (not alert.last_sent) or (timezone.now() - alert.last_sent) >= timedelta(days=1)
-
-        if not should_send:
-            results.append({"alert_id": alert.id, "email": alert.email, "status": "skipped", "reason": "Frequency limit not reached"})
-            continue
-
-        news_items = list(NewsItem.objects.filter(published_at__gte=since))
-        filtered_items = NewsFilterService.filter_news(news_items, alert.filter_criteria)
-        if not filtered_items:
-            results.append({"alert_id": alert.id, "email": alert.email, "status": "no_news", "count": 0})
-            continue
-
-        success = EmailAlertService.send_alert(alert, filtered_items[:10])
-        results.append(
-            {
-                "alert_id": alert.id,
-                "email": alert.email,
-                "status": "sent" if success else "failed",
-                "count": len(filtered_items),
-            }
-        )
-
-    return JsonResponse({"processed": len(results), "results": results})
+    job = start_process_alerts_job(days=data.get("days", 1))
+    return _job_accepted(request, job)
 
 
 # ---------------------------------------------------------------------------
@@ -311,15 +469,57 @@ def alerts_process_all(request):
 # ---------------------------------------------------------------------------
 
 @csrf_exempt
+@cache_control(no_cache=True)
+@condition(etag_func=_alert_history_etag)
 def alert_history_list(request):
     if request.method != "GET":
         return HttpResponseNotAllowed(["GET"])
 
     alert_id = request.GET.get("alert")
-    qs = AlertHistory.objects.all()
+    qs = AlertHistory.objects.select_related("alert__filter_criteria")
     if alert_id:
         qs = qs.filter(alert_id=alert_id)
 
-    history = [alert_history_to_dict(h) for h in qs.order_by("-sent_at")]
-    return JsonResponse({"count": len(history), "results": history})
+    # ?news_items=ids returns article ids instead of embedded articles
+    ids_only = request.GET.get("news_items") == "ids"
+    if ids_only:
+        qs = qs.prefetch_related(Prefetch("news_items", queryset=NewsItem.objects.only("id")))
+    else:
+        qs = qs.prefetch_related("news_items")
+
+    paginator = KeysetPaginator("sent_at", get_page_size(request))
+    try:
+        page, next_cursor = paginator.paginate(qs, request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    history = [alert_history_to_dict(h, news_item_ids_only=ids_only) for h in page]
+    return JsonResponse({"count": len(history), "next": next_page_url(request, next_cursor), "results": history})
+
+
+
+# ---------------------------------------------------------------------------
+# Background jobs
+# ---------------------------------------------------------------------------
+
+@csrf_exempt
+def job_detail(request, job_id):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    job = get_object_or_404(Job, pk=job_id)
+    return JsonResponse(job_to_dict(job))
+
+
+def cache_stats(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    return JsonResponse(response_cache_stats())
+
+
+def metrics(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
 
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,13 @@
+"""
+Celery application for news_alert project.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'news_alert.settings')
+
+app = Celery('news_alert')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'alerts.middleware.RequestMetricsMiddleware',  # First, so timings cover the whole stack
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For serving static files
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -131,11 +132,43 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Upper bound for the page_size query parameter on cursor-paginated endpoints
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=100, cast=int)
+
+# Caches: Redis when REDIS_URL is set, otherwise per-process local memory
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Response cache for read endpoints. Entries are invalidated by a data
+# generation counter; the timeout only bounds drift of time-windowed results.
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+RESPONSE_CACHE_ALIAS = config('RESPONSE_CACHE_ALIAS', default='default')
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Request and pipeline metrics, served in Prometheus format at /api/metrics/.
+# Each process publishes its totals to the cache at most every flush interval.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=10, cast=float)
+METRICS_PROCESS_TTL = config('METRICS_PROCESS_TTL', default=3600, cast=int)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
-    'https://newsapp-alert.netlify.app/'
+    'https://newsapp-alert.netlify.app'
 ]
 
 CORS_ALLOW_CREDENTIALS = True
@@ -149,7 +182,28 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER)
 
+# Alert delivery: messages per SMTP connection, retries and base backoff (seconds) for transient errors
+EMAIL_BATCH_SIZE = config('EMAIL_BATCH_SIZE', default=100, cast=int)
+EMAIL_MAX_RETRIES = config('EMAIL_MAX_RETRIES', default=2, cast=int)
+EMAIL_RETRY_BACKOFF = config('EMAIL_RETRY_BACKOFF', default=1.0, cast=float)
+# Merge all due alerts for one address into a single message per run
+EMAIL_CONSOLIDATE_DIGESTS = config('EMAIL_CONSOLIDATE_DIGESTS', default=False, cast=bool)
+
+# Celery: background pipeline for fetching news and processing alerts.
+# Without a broker URL tasks run eagerly in the calling process.
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='')
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=not CELERY_BROKER_URL, cast=bool)
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TIMEZONE = TIME_ZONE
+
 # News API settings
 NEWS_API_KEY = config('NEWS_API_KEY', default='')
 NEWS_API_URL = 'https://newsapi.org/v2'
 
+# News fetching: worker threads, retries with exponential backoff, requests per second per host
+NEWS_FETCH_CONCURRENCY = config('NEWS_FETCH_CONCURRENCY', default=4, cast=int)
+NEWS_FETCH_MAX_RETRIES = config('NEWS_FETCH_MAX_RETRIES', default=3, cast=int)
+NEWS_FETCH_BACKOFF = config('NEWS_FETCH_BACKOFF', default=0.5, cast=float)
+NEWS_FETCH_RATE_LIMIT = config('NEWS_FETCH_RATE_LIMIT', default=5.0, cast=float)
+
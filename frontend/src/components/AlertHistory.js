@@ -1,11 +1,11 @@
 import React, { useEffect, useState } from 'react';
 import { useDispatch, useSelector } from 'react-redux';
-import { fetchAlertHistory } from '../store/slices/alertHistorySlice';
+import { fetchAlertHistory, fetchMoreAlertHistory } from '../store/slices/alertHistorySlice';
 import { fetchAlerts } from '../store/slices/alertsSlice';
 
 const AlertHistory = () => {
   const dispatch = useDispatch();
-  const { items, loading, error } = useSelector((state) => state.alertHistory);
+  const { items, loading, loadingMore, next, error } = useSelector((state) => state.alertHistory);
   const { items: alerts } = useSelector((state) => state.alerts);
   const [selectedAlert, setSelectedAlert] = useState('');
 
@@ -81,6 +81,14 @@ const AlertHistory = () => {
           </table>
         </div>
       )}
+
+      {!loading && next && (
+        <div style={{ textAlign: 'center', marginTop: '20px' }}>
+          <button className="btn btn-secondary" onClick={() => dispatch(fetchMoreAlertHistory())} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load More'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
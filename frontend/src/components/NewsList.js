@@ -1,10 +1,10 @@
 import React, { useEffect, useState } from 'react';
 import { useDispatch, useSelector } from 'react-redux';
-import { fetchNews, fetchNewsFromAPI } from '../store/slices/newsSlice';
+import { fetchMoreNews, fetchNews, fetchNewsFromAPI } from '../store/slices/newsSlice';
 
 const NewsList = () => {
   const dispatch = useDispatch();
-  const { items, loading, error } = useSelector((state) => state.news);
+  const { items, loading, loadingMore, next, error } = useSelector((state) => state.news);
   const [showFetchModal, setShowFetchModal] = useState(false);
   const [fetchParams, setFetchParams] = useState({
     category: '',
@@ -103,6 +103,14 @@ const NewsList = () => {
         </div>
       )}
 
+      {!loading && next && (
+        <div style={{ textAlign: 'center', marginTop: '20px' }}>
+          <button className="btn btn-secondary" onClick={() => dispatch(fetchMoreNews())} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load More'}
+          </button>
+        </div>
+      )}
+
       {showFetchModal && (
         <div className="modal">
           <div className="modal-content">
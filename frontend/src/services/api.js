@@ -37,6 +37,34 @@ export const alertsAPI = {
   processAllAlerts: (data) => api.post('/alerts/process_all/', data),
 };
 
+// Background jobs API
+export const jobsAPI = {
+  getJob: (id) => api.get(`/jobs/${id}/`),
+};
+
+// Poll a background job until it succeeds or fails. Rejects after maxWaitMs, e.g. when no
+// Celery worker is running and the job stays pending
+export const waitForJob = async (jobId, { intervalMs = 1000, maxWaitMs = 300000 } = {}) => {
+  const deadline = Date.now() + maxWaitMs;
+  for (;;) {
+    const response = await jobsAPI.getJob(jobId);
+    if (response.data.status === 'succeeded' || response.data.status === 'failed') {
+      return response.data;
+    }
+    if (Date.now() + intervalMs > deadline) {
+      const error = new Error(
+        `Job ${jobId} is still ${response.data.status} after ${Math.round(maxWaitMs / 1000)} seconds. Is a Celery worker running?`
+      );
+      error.code = 'JOB_TIMEOUT';
+      throw error;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
+// List endpoints return one page plus a `next` URL; turn it into query params for the following page
+export const nextPageParams = (next) => Object.fromEntries(new URL(next).searchParams);
+
 // Alert History API
 export const alertHistoryAPI = {
   getAlertHistory: (params = {}) => api.get('/alert-history/', { params }),
@@ -1,5 +1,5 @@
 import { createSlice, createAsyncThunk } from '@reduxjs/toolkit';
-import { alertHistoryAPI } from '../../services/api';
+import { alertHistoryAPI, nextPageParams } from '../../services/api';
 
 export const fetchAlertHistory = createAsyncThunk(
   'alertHistory/fetchAlertHistory',
@@ -13,12 +13,29 @@ export const fetchAlertHistory = createAsyncThunk(
   }
 );
 
+export const fetchMoreAlertHistory = createAsyncThunk(
+  'alertHistory/fetchMoreAlertHistory',
+  async (_, { getState, rejectWithValue }) => {
+    try {
+      const response = await alertHistoryAPI.getAlertHistory(nextPageParams(getState().alertHistory.next));
+      return response.data;
+    } catch (error) {
+      return rejectWithValue(error.response?.data || error.message);
+    }
+  },
+  {
+    condition: (_, { getState }) => Boolean(getState().alertHistory.next) && !getState().alertHistory.loadingMore,
+  }
+);
+
 const alertHistorySlice = createSlice({
   name: 'alertHistory',
   initialState: {
     items: [],
     loading: false,
+    loadingMore: false,
     error: null,
+    next: null,
   },
   reducers: {
     clearError: (state) => {
@@ -34,6 +51,20 @@ const alertHistorySlice = createSlice({
       .addCase(fetchAlertHistory.fulfilled, (state, action) => {
         state.loading = false;
         state.items = action.payload.results || action.payload;
+        state.next = action.payload.next || null;
+      })
+      .addCase(fetchMoreAlertHistory.pending, (state) => {
+        state.loadingMore = true;
+        state.error = null;
+      })
+      .addCase(fetchMoreAlertHistory.fulfilled, (state, action) => {
+        state.loadingMore = false;
+        state.items = state.items.concat(action.payload.results);
+        state.next = action.payload.next || null;
+      })
+      .addCase(fetchMoreAlertHistory.rejected, (state, action) => {
+        state.loadingMore = false;
+        state.error = action.payload;
       })
       .addCase(fetchAlertHistory.rejected, (state, action) => {
         state.loading = false;
@@ -1,5 +1,5 @@
 import { createSlice, createAsyncThunk } from '@reduxjs/toolkit';
-import { alertsAPI } from '../../services/api';
+import { alertsAPI, waitForJob } from '../../services/api';
 
 export const fetchAlerts = createAsyncThunk(
   'alerts/fetchAlerts',
@@ -66,7 +66,11 @@ export const processAllAlerts = createAsyncThunk(
   async (data = {}, { rejectWithValue }) => {
     try {
       const response = await alertsAPI.processAllAlerts(data);
-      return response.data;
+      const job = await waitForJob(response.data.job_id);
+      if (job.status === 'failed') {
+        return rejectWithValue(job.error);
+      }
+      return job.result;
     } catch (error) {
       return rejectWithValue(error.response?.data || error.message);
     }
@@ -1,5 +1,5 @@
 import { createSlice, createAsyncThunk } from '@reduxjs/toolkit';
-import { newsAPI } from '../../services/api';
+import { newsAPI, nextPageParams, waitForJob } from '../../services/api';
 
 export const fetchNews = createAsyncThunk(
   'news/fetchNews',
@@ -9,7 +9,7 @@ export const fetchNews = createAsyncThunk(
       return response.data;
     } catch (error) {
       const errorData = error.response?.data || { message: error.message };
-      if (error.code === 'ERR_NETWORK' || !error.response) {
+      if (error.code === 'ERR_NETWORK' || (!error.response && error.code !== 'JOB_TIMEOUT')) {
         errorData.message = 'Cannot connect to backend server. Please make sure it is running at http://localhost:8000';
       }
       return rejectWithValue(errorData);
@@ -17,15 +17,35 @@ export const fetchNews = createAsyncThunk(
   }
 );
 
+export const fetchMoreNews = createAsyncThunk(
+  'news/fetchMoreNews',
+  async (_, { getState, rejectWithValue }) => {
+    const { next } = getState().news;
+    try {
+      const response = await newsAPI.getNews(nextPageParams(next));
+      return response.data;
+    } catch (error) {
+      return rejectWithValue(error.response?.data || { message: error.message });
+    }
+  },
+  {
+    condition: (_, { getState }) => Boolean(getState().news.next) && !getState().news.loadingMore,
+  }
+);
+
 export const fetchNewsFromAPI = createAsyncThunk(
   'news/fetchNewsFromAPI',
   async (data = {}, { rejectWithValue }) => {
     try {
       const response = await newsAPI.fetchNews(data);
-      return response.data;
+      const job = await waitForJob(response.data.job_id);
+      if (job.status === 'failed') {
+        return rejectWithValue({ message: job.error });
+      }
+      return job.result;
     } catch (error) {
       const errorData = error.response?.data || { message: error.message };
-      if (error.code === 'ERR_NETWORK' || !error.response) {
+      if (error.code === 'ERR_NETWORK' || (!error.response && error.code !== 'JOB_TIMEOUT')) {
         errorData.message = 'Cannot connect to backend server. Please make sure it is running at http://localhost:8000';
       }
       return rejectWithValue(errorData);
@@ -38,6 +58,7 @@ const newsSlice = createSlice({
   initialState: {
     items: [],
     loading: false,
+    loadingMore: false,
     error: null,
     count: 0,
     next: null,
@@ -57,7 +78,22 @@ const newsSlice = createSlice({
       .addCase(fetchNews.fulfilled, (state, action) => {
         state.loading = false;
         state.items = action.payload.results || action.payload;
-        state.count = action.payload.count || action.payload.length;
+        state.count = state.items.length;
+        state.next = action.payload.next || null;
+      })
+      .addCase(fetchMoreNews.pending, (state) => {
+        state.loadingMore = true;
+        state.error = null;
+      })
+      .addCase(fetchMoreNews.fulfilled, (state, action) => {
+        state.loadingMore = false;
+        state.items = state.items.concat(action.payload.results);
+        state.count = state.items.length;
+        state.next = action.payload.next || null;
+      })
+      .addCase(fetchMoreNews.rejected, (state, action) => {
+        state.loadingMore = false;
+        state.error = action.payload || { message: 'An unknown error occurred' };
       })
       .addCase(fetchNews.rejected, (state, action) => {
         state.loading = false;
@@ -67,10 +103,9 @@ const newsSlice = createSlice({
         state.loading = true;
         state.error = null;
       })
-      .addCase(fetchNewsFromAPI.fulfilled, (state, action) => {
+      .addCase(fetchNewsFromAPI.fulfilled, (state) => {
+        // The job result only carries counts; the component reloads the list
         state.loading = false;
-        state.items = action.payload.results || [];
-        state.count = action.payload.count || 0;
       })
       .addCase(fetchNewsFromAPI.rejected, (state, action) => {
         state.loading = false;